@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+"""
+Micro-benchmark of `sql_query_tools.utils.assert_value_dtype`, the per-value type check
+behind the statement builders. Reports the mean time per call for a range of dtypes and
+values, and writes the results to a JSON file.
+
+Usage:
+
+    python benchmarks/bench_assert_value_dtype.py --output bench_assert_value_dtype.json
+"""
+
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sql_query_tools.utils import assert_value_dtype
+
+
+CASES = [
+    ('bool', True),
+    ('bool', 'yes'),
+    ('int', 5),
+    ('int', '12345'),
+    ('int', 'not an int'),
+    ('float', 7.5),
+    ('float', '7.5'),
+    ('date', '2021-10-04'),
+    ('date', datetime.date(2021, 10, 4)),
+    ('datetime', '2021-10-04 12:30:00'),
+    ('datetime', '2021-10-04 12:30:00.123456'),
+    ('datetime', datetime.datetime(2021, 10, 4, 12, 30)),
+    ('datetime', 'not a datetime'),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Micro-benchmark utils.assert_value_dtype.')
+    parser.add_argument('--output', default='bench_assert_value_dtype.json', help='path of JSON results file')
+    parser.add_argument('--number', type=int, default=20000, help='calls per timing')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timings per case, best is reported')
+    args = parser.parse_args()
+
+    results = []
+    for dtype, value in CASES:
+        timings = timeit.repeat(lambda: assert_value_dtype(value, dtype), number=args.number, repeat=args.repeat)
+        us_per_call = min(timings) / args.number * 1e6
+        results.append(dict(dtype=dtype, value=repr(value), us_per_call=us_per_call))
+        print(f'{dtype:<10} {repr(value):<45} {us_per_call:8.3f} us/call', file=sys.stderr)
+
+    with open(args.output, 'w') as f:
+        json.dump(dict(metadata=dict(timestamp=datetime.datetime.now().isoformat(),
+                                     python_version=platform.python_version(),
+                                     platform=platform.platform()),
+                       results=results), f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+"""
+Benchmark the time taken to `import sql_query_tools` in a fresh interpreter, and guard
+against heavy dependencies (pandas, sqlalchemy, ...) being imported eagerly.
+
+Each repetition runs `python -X importtime -c "import sql_query_tools"` in a subprocess.
+Exit with a nonzero status if any heavy dependency is loaded by the import, or if the
+median cumulative import time exceeds `--max-ms`.
+
+Usage:
+
+    python benchmarks/bench_import.py --output bench_import.json --max-ms 100
+"""
+
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+
+
+HEAVY_MODULES = ['pandas', 'numpy', 'sqlalchemy', 'tqdm', 'click', 'dateutil']
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_time_us(module: str='sql_query_tools') -> int:
+    """
+    Import `module` in a fresh interpreter and return its cumulative import time in
+    microseconds as reported by `-X importtime`.
+    """
+    p = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                       cwd=REPO_DIR, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                       universal_newlines=True, check=True)
+
+    for line in p.stderr.splitlines():
+        m = re.search(r'^import time:\s*\d+\s*\|\s*(?P<cumulative>\d+)\s*\|\s*(?P<name>\S+)\s*$', line)
+        if m and m.group('name') == module:
+            return int(m.group('cumulative'))
+
+    raise ValueError(f'Import time of {module} not found in `-X importtime` output')
+
+
+def loaded_heavy_modules(code: str='import sql_query_tools') -> list:
+    """
+    Run `code` in a fresh interpreter and return the heavy dependencies that it imported.
+    """
+    check = f'{code}; import sys; print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+    p = subprocess.run([sys.executable, '-c', check],
+                       cwd=REPO_DIR, stdout=subprocess.PIPE, universal_newlines=True, check=True)
+    return [x for x in p.stdout.strip().split(',') if x]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark `import sql_query_tools` startup time.')
+    parser.add_argument('--output', default='bench_import.json', help='path of JSON results file')
+    parser.add_argument('--repeat', type=int, default=10, help='number of fresh interpreters to time')
+    parser.add_argument('--max-ms', type=float, default=None,
+                        help='fail if the median cumulative import time exceeds this many milliseconds')
+    args = parser.parse_args()
+
+    durations_ms = [import_time_us() / 1000 for _ in range(args.repeat)]
+    median_ms = statistics.median(durations_ms)
+    heavy = loaded_heavy_modules()
+    heavy_offline = loaded_heavy_modules('import sql_query_tools; '
+                                         'pg = sql_query_tools.Postgres(offline=True); '
+                                         'pg.build_insert("s", "t", ["a", "b"], [1, "x"])')
+
+    results = dict(metadata=dict(timestamp=datetime.datetime.now().isoformat(),
+                                 python_version=platform.python_version(),
+                                 platform=platform.platform()),
+                   results=[dict(name='import sql_query_tools',
+                                 milliseconds=durations_ms,
+                                 min=min(durations_ms),
+                                 median=median_ms,
+                                 heavy_modules_loaded=heavy),
+                           dict(name='Postgres(offline=True).build_insert()',
+                                heavy_modules_loaded=heavy_offline)])
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    print(f'import sql_query_tools: median {median_ms:.3f} ms, heavy modules loaded: {heavy}', file=sys.stderr)
+
+    if len(heavy) or len(heavy_offline):
+        sys.exit(f'Heavy dependencies imported eagerly: {sorted(set(heavy + heavy_offline))}')
+
+    if args.max_ms is not None and median_ms > args.max_ms:
+        sys.exit(f'Median import time {median_ms:.3f} ms exceeds limit of {args.max_ms} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+
+"""
+Benchmarks for the `sql_query_tools.Postgres` helper surface.
+
+Launches a throwaway Postgres cluster with `initdb` in a temporary directory, runs each
+benchmark against it and writes the results to a JSON file so that they may be compared
+between releases. Postgres server binaries (`initdb`, `pg_ctl`) must be on the PATH or in
+the directory passed to `--pg-bin-dir`.
+
+Usage:
+
+    python benchmarks/bench_postgres.py --output bench_postgres.json
+"""
+
+
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sql_query_tools
+from sql_query_tools import Postgres
+
+
+SCHEMA_NAME = 'bench'
+TABLE_NAME = 'facts'
+COLUMNSPEC = {
+    'id': 'bigint primary key',
+    'val': 'double precision',
+    'label': 'text',
+    'flag': 'boolean',
+    'created': 'timestamp',
+}
+
+
+class TemporaryCluster(object):
+    """
+    Throwaway Postgres cluster in a temporary directory, trusting local connections.
+    """
+    def __init__(self, pg_bin_dir: str=None, user: str='bench') -> None:
+        self.pg_bin_dir = pg_bin_dir
+        self.user = user
+        self.tmpdir = tempfile.mkdtemp(prefix='sql_query_tools_bench_')
+        self.datadir = os.path.join(self.tmpdir, 'data')
+        self.port = self._free_port()
+
+    def _binary(self, name: str) -> str:
+        """
+        Locate a Postgres server binary.
+        """
+        if self.pg_bin_dir is not None:
+            return os.path.join(self.pg_bin_dir, name)
+
+        path = shutil.which(name)
+        if path is None:
+            raise FileNotFoundError(f"No matching binaries found for '{name}', pass --pg-bin-dir")
+
+        return path
+
+    def _free_port(self) -> int:
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    def start(self) -> None:
+        subprocess.run([self._binary('initdb'), '-D', self.datadir, '-U', self.user, '--auth=trust'],
+                       check=True, stdout=subprocess.DEVNULL)
+        options = f'-p {self.port} -k {self.tmpdir} -c listen_addresses=127.0.0.1 -c fsync=off'
+        subprocess.run([self._binary('pg_ctl'), '-D', self.datadir, '-o', options, '-w', 'start',
+                        '-l', os.path.join(self.tmpdir, 'postgres.log')],
+                       check=True, stdout=subprocess.DEVNULL)
+
+    def stop(self) -> None:
+        subprocess.run([self._binary('pg_ctl'), '-D', self.datadir, '-m', 'immediate', 'stop'],
+                       stdout=subprocess.DEVNULL)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def connect(self) -> Postgres:
+        return Postgres(hostname='127.0.0.1',
+                        port=str(self.port),
+                        db_name='postgres',
+                        pg_user=self.user,
+                        pw='',
+                        credentials_fpath=os.path.join(self.tmpdir, 'nonexistent.pgpass'))
+
+
+def timeit(fn: typing.Callable, repeat: int=5, setup: typing.Callable=None) -> list:
+    """
+    Call `fn` `repeat` times and return the wall time of each call in seconds. If given,
+    `setup` is called before each call and is not timed.
+    """
+    durations = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+
+    return durations
+
+
+def result(name: str, durations: list, n: int=None, unit: str='rows', **params) -> dict:
+    """
+    Summarize the durations of a benchmark as a JSON-serializable dictionary.
+    """
+    median = statistics.median(durations)
+    res = dict(name=name,
+               params=params,
+               seconds=durations,
+               min=min(durations),
+               median=median,
+               mean=statistics.mean(durations))
+    if n is not None:
+        res[f'{unit}_per_second'] = n / median if median > 0 else None
+
+    print(f'{name:<32} {str(params):<40} median {median * 1000:10.3f} ms', file=sys.stderr)
+    return res
+
+
+def make_rows(n: int) -> list:
+    created = datetime.datetime(2020, 1, 1)
+    return [[i, i * 0.5, f"label '{i}'", i % 2 == 0, str(created + datetime.timedelta(seconds=i))] for i in range(n)]
+
+
+def load_rows(pg: Postgres, n: int) -> None:
+    pg.wipe_table(SCHEMA_NAME, TABLE_NAME, truncate=True)
+    stmts = pg.build_insert_many(SCHEMA_NAME, TABLE_NAME, columns=list(COLUMNSPEC), rows=make_rows(n))
+    pg.execute(stmts)
+
+
+def bench_build_insert(pg: Postgres, n: int, repeat: int) -> list:
+    rows = make_rows(n)
+    columns = list(COLUMNSPEC)
+    results = []
+    for validate in [False, True]:
+        durations = timeit(lambda: [pg.build_insert(SCHEMA_NAME, TABLE_NAME, columns, row, validate=validate) for row in rows],
+                           repeat=repeat)
+        results.append(result('build_insert', durations, n=n, rows=n, validate=validate))
+
+    durations = timeit(lambda: pg.build_insert_many(SCHEMA_NAME, TABLE_NAME, columns, rows), repeat=repeat)
+    results.append(result('build_insert_many', durations, n=n, rows=n))
+    return results
+
+
+def bench_build_update(pg: Postgres, n: int, repeat: int) -> list:
+    rows = make_rows(n)
+    columns = list(COLUMNSPEC)[1:]
+    results = []
+    for validate in [False, True]:
+        durations = timeit(lambda: [pg.build_update(SCHEMA_NAME, TABLE_NAME, 'id', row[0], columns, row[1:], validate=validate) for row in rows],
+                           repeat=repeat)
+        results.append(result('build_update', durations, n=n, rows=n, validate=validate))
+
+    return results
+
+
+def bench_read(pg: Postgres, row_counts: list, repeat: int) -> list:
+    results = []
+    for n in row_counts:
+        load_rows(pg, n)
+        durations = timeit(lambda: pg.read_sql(f'select * from {SCHEMA_NAME}.{TABLE_NAME}'), repeat=repeat)
+        results.append(result('read_sql', durations, n=n, rows=n))
+        if importlib.util.find_spec('pyarrow') is not None:
+            durations = timeit(lambda: pg.read_sql(f'select * from {SCHEMA_NAME}.{TABLE_NAME}', engine='arrow'),
+                               repeat=repeat)
+            results.append(result('read_sql', durations, n=n, rows=n, engine='arrow'))
+        durations = timeit(lambda: pg.read_table(SCHEMA_NAME, TABLE_NAME), repeat=repeat)
+        results.append(result('read_table', durations, n=n, rows=n))
+
+    return results
+
+
+def bench_validate_dtype(pg: Postgres, repeat: int) -> list:
+    calls = 1000
+    validate = lambda: [pg.validate_dtype(SCHEMA_NAME, TABLE_NAME, 'val', 1.5) for _ in range(calls)]
+    results = []
+
+    durations = timeit(validate, repeat=repeat, setup=pg.invalidate_metadata)
+    results.append(result('validate_dtype', durations, n=calls, unit='calls', calls=calls, cache='cold'))
+
+    durations = timeit(validate, repeat=repeat)
+    results.append(result('validate_dtype', durations, n=calls, unit='calls', calls=calls, cache='warm'))
+    return results
+
+
+def bench_dump_tables(pg: Postgres, n: int, repeat: int) -> list:
+    load_rows(pg, n)
+    results = []
+    for method in ['server', 'client']:
+        backup_dir = tempfile.mkdtemp(prefix='sql_query_tools_bench_dump_')
+        try:
+            durations = timeit(lambda: pg.dump_tables(backup_dir, method=method), repeat=repeat)
+        finally:
+            shutil.rmtree(backup_dir, ignore_errors=True)
+
+        results.append(result('dump_tables', durations, n=n, rows=n, method=method))
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the sql_query_tools Postgres helpers.')
+    parser.add_argument('--output', default='bench_postgres.json', help='path of JSON results file')
+    parser.add_argument('--pg-bin-dir', default=None, help='directory holding initdb and pg_ctl')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='row counts for read benchmarks')
+    parser.add_argument('--build-rows', type=int, default=10000, help='row count for statement builder benchmarks')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timed repetitions per benchmark')
+    args = parser.parse_args()
+
+    cluster = TemporaryCluster(pg_bin_dir=args.pg_bin_dir)
+    cluster.start()
+    try:
+        pg = cluster.connect()
+        pg.create_schema(SCHEMA_NAME)
+        pg.create_table(SCHEMA_NAME, TABLE_NAME, COLUMNSPEC)
+
+        results = []
+        results += bench_build_insert(pg, args.build_rows, args.repeat)
+        results += bench_build_update(pg, args.build_rows, args.repeat)
+        results += bench_read(pg, args.rows, args.repeat)
+        results += bench_validate_dtype(pg, args.repeat)
+        results += bench_dump_tables(pg, max(args.rows), args.repeat)
+
+        metadata = dict(timestamp=datetime.datetime.now().isoformat(),
+                        sql_query_tools_version=sql_query_tools.__version__,
+                        python_version=platform.python_version(),
+                        platform=platform.platform(),
+                        postgres_version=pg.read_sql('show server_version').iloc[0])
+
+    finally:
+        cluster.stop()
+
+    with open(args.output, 'w') as f:
+        json.dump(dict(metadata=metadata, results=results), f, indent=2)
+
+    print(f'Wrote benchmark results to "{args.output}"', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
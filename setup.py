@@ -15,6 +15,11 @@ requirements = [ ]
 
 test_requirements = [ ]
 
+extras_requirements = {
+    'async': ['asyncpg', 'SQLAlchemy>=1.4'],
+    'pyarrow': ['pyarrow'],
+}
+
 setup(
     author="Andoni Sooklaris",
     author_email='andoni.sooklaris@gmail.com',
@@ -31,6 +36,7 @@ setup(
     ],
     description="Convenient utilities for querying various flavors of SQL databases.",
     install_requires=requirements,
+    extras_require=extras_requirements,
     license="MIT license",
     # long_description_content_type='text/x-rst',
     # long_description=readme + '\n\n' + changelog,
@@ -8,18 +8,123 @@ __author__ = """Andoni Sooklaris"""
 __email__ = 'andoni.sooklaris@gmail.com'
 
 import csv
+import importlib
+import itertools
+import json
 import logging
+import numbers
 import os
-import pandas as pd
 import pathlib
-import sqlalchemy
+import re
+import queue
+import sys
+import threading
+import time
 import typing
-from tqdm import tqdm
-from .utils import logger_setup, assert_value_dtype, ensurelist, systime, find_binary, syscmd, listfiles
+from concurrent.futures import ThreadPoolExecutor
+from .utils import LazyModule, logger_setup, assert_value_dtype, ensurelist, systime, find_binary, run_cmd, listfiles, StringIteratorIO, BufferedLogWriter, MemoryStatsSink
 
 
+# Heavy dependencies are imported on first use, so that importing this package and
+# rendering SQL with the statement builders does not load them
+pd = LazyModule('pandas')
+asyncio = LazyModule('asyncio')
+sqlalchemy = LazyModule('sqlalchemy')
+tqdm = LazyModule('tqdm')
+
 logger = logger_setup(name='sql-query-tools', level=logging.WARNING)
 
+# Maximum number of bind parameters Postgres accepts in a single statement
+PG_MAX_BIND_PARAMS = 65535
+
+# Column metadata of a single relation. Queries pg_catalog directly for the requested relation
+# only. Domains are reported as their base type, matching information_schema.columns.data_type,
+# and `full_data_type` includes type modifiers, i.e. 'numeric(12,4)' where `data_type` is 'numeric'
+TABLE_COLUMNS_SQL = """
+select a.attname as column_name
+       , format_type(case when t.typtype = 'd' then t.typbasetype else a.atttypid end, null) as data_type
+       , format_type(case when t.typtype = 'd' then t.typbasetype else a.atttypid end,
+                     case when t.typtype = 'd' then t.typtypmod else a.atttypmod end) as full_data_type
+       , not a.attnotnull as is_nullable
+from pg_catalog.pg_attribute a
+join pg_catalog.pg_class c
+  on c.oid = a.attrelid
+join pg_catalog.pg_namespace n
+  on n.oid = c.relnamespace
+join pg_catalog.pg_type t
+  on t.oid = a.atttypid
+where n.nspname = :schema_name
+  and c.relname = :table_name
+  and a.attnum > 0
+  and not a.attisdropped
+order by a.attnum
+"""
+
+# Values of pg_class.relkind matched by the existence checks, per kind of relation
+RELKINDS = {
+    'table': ['r', 'p'],
+    'view': ['v'],
+    'table_or_view': ['r', 'p', 'v'],
+}
+
+# Process-wide registry of SQLAlchemy engines shared between `Postgres` instances, keyed
+# by connection string and engine options
+_engine_registry = {}
+_engine_registry_lock = threading.Lock()
+
+
+def _is_dataframe(obj: typing.Any) -> bool:
+    """
+    Determine whether an object is a pandas DataFrame without importing pandas, which must
+    already be loaded if `obj` is a DataFrame.
+    """
+    return 'pandas' in sys.modules and isinstance(obj, pd.DataFrame)
+
+
+def _is_number(val: typing.Any) -> bool:
+    """
+    Determine whether a value is numeric (including booleans) by type.
+    """
+    return isinstance(val, numbers.Number)
+
+
+def _import_optional(name: str, feature: str, extra: str=None) -> typing.Any:
+    """
+    Import an optional dependency, raising an ImportError naming the feature that needs it
+    and the package extra that installs it if it is not installed.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        package = name.split('.')[0]
+        install = f'sql_query_tools[{extra}]' if extra is not None else package
+        raise ImportError(f'{feature} requires the optional dependency `{package}`, '
+                          f'install it with `pip install {install}`')
+
+
+def _sync_only(name: str) -> typing.Callable:
+    """
+    Build a method for `AsyncPostgres` that replaces a blocking `Postgres` helper which has
+    no asynchronous counterpart.
+    """
+    def method(self, *args, **kwargs):
+        raise Exception(f'`{name}()` is not available on AsyncPostgres, use a Postgres instance instead')
+
+    method.__name__ = name
+    return method
+
+
+def dispose_engines() -> None:
+    """
+    Close all pooled connections of every shared engine and empty the engine registry.
+    Useful after forking a worker process, which must not reuse its parent's connections.
+    """
+    with _engine_registry_lock:
+        for engine in _engine_registry.values():
+            engine.dispose()
+
+        _engine_registry.clear()
+
 
 class Postgres(object):
     """
@@ -30,6 +135,24 @@ class Postgres(object):
         hostname,port,db_name,user_name,password
 
     and passing the path to that file to the `credentials_fpath` argument.
+
+    Column metadata used by `validate_dtype()`, `col_names()` and `col_dtypes()` is cached
+    per (schema, table) for `metadata_ttl` seconds. Set `metadata_ttl` to None to cache
+    indefinitely, or to 0 to disable caching. DDL helpers invalidate the cache automatically,
+    and `invalidate_metadata()` may be called after DDL executed by other means.
+
+    Connections are pooled. `pool_size`, `max_overflow`, `pool_pre_ping` and `pool_recycle`
+    are passed to `sqlalchemy.create_engine()`, and `statement_timeout` (milliseconds) is set
+    on every pooled connection. Unless `share_engine` is False, instances with the same
+    connection string and pool options share a single engine, and thus a single pool, per process.
+
+    Set `instrument` to record the wall time, rows, approximate bytes fetched and calling
+    helper of every query to an in-memory `MemoryStatsSink` at `self.stats_sink`, or pass
+    any object with a `record(event: dict)` method as `stats_sink` to receive events directly.
+
+    The database engine is created on first use, not on construction. Set `offline` to
+    use an instance for statement building only, i.e. `build_insert()` or `build_delete()`,
+    in which case no credentials are required and any attempt to connect raises an error.
     """
     def __init__(self,
                  hostname: str=None,
@@ -37,10 +160,22 @@ class Postgres(object):
                  db_name: str=None,
                  pg_user: str=None,
                  pw: str=None,
-                 credentials_fpath: str=os.path.expanduser('~/.pgpass')) -> None:
+                 credentials_fpath: str=os.path.expanduser('~/.pgpass'),
+                 metadata_ttl: float=300,
+                 pool_size: int=5,
+                 max_overflow: int=10,
+                 pool_pre_ping: bool=False,
+                 pool_recycle: int=-1,
+                 statement_timeout: int=None,
+                 share_engine: bool=True,
+                 instrument: bool=False,
+                 stats_sink: typing.Any=None,
+                 offline: bool=False) -> None:
+        self.offline = offline
+
         # Get credentials
         credentials_fpath = os.path.expanduser(credentials_fpath)
-        if os.path.isfile(credentials_fpath):
+        if not offline and os.path.isfile(credentials_fpath):
             self.hostname, self.port, self.db_name, self.pg_user, self.pw = self.read_pgpass(credentials_fpath)
         else:
             self.hostname = hostname
@@ -49,17 +184,53 @@ class Postgres(object):
             self.pg_user = pg_user
             self.pw = pw
 
-        assert self.hostname is not None, 'Must provide hostname'
-        assert self.port is not None, 'Must provide port'
-        assert self.db_name is not None, 'Must provide database name'
-        assert self.pg_user is not None, 'Must provide username'
-        assert self.pw is not None, 'Must provide password'
+        if not offline:
+            assert self.hostname is not None, 'Must provide hostname'
+            assert self.port is not None, 'Must provide port'
+            assert self.db_name is not None, 'Must provide database name'
+            assert self.pg_user is not None, 'Must provide username'
+            assert self.pw is not None, 'Must provide password'
+
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_pre_ping = pool_pre_ping
+        self.pool_recycle = pool_recycle
+        self.statement_timeout = statement_timeout
+        self.share_engine = share_engine
 
-        self.dbcon = self.connect()
+        self._dbcon = None
+        self._dbcon_lock = threading.Lock()
 
         self.null_equivalents = ['nan', 'n/a', 'null', 'none', '']
         self.null_equivalents = self.null_equivalents + [x.upper() for x in self.null_equivalents]
 
+        self.metadata_ttl = metadata_ttl
+        self._metadata_cache = {}
+
+        if stats_sink is None and instrument:
+            stats_sink = MemoryStatsSink()
+
+        self.stats_sink = stats_sink
+
+    @property
+    def dbcon(self) -> 'sqlalchemy.engine.base.Engine':
+        """
+        Database engine, created by `connect()` on first access.
+        """
+        if self._dbcon is None:
+            if self.offline:
+                raise Exception('Postgres instance is in offline mode and cannot connect to the database')
+
+            with self._dbcon_lock:
+                if self._dbcon is None:
+                    self._dbcon = self.connect()
+
+        return self._dbcon
+
+    @dbcon.setter
+    def dbcon(self, engine: 'sqlalchemy.engine.base.Engine') -> None:
+        self._dbcon = engine
+
     def read_pgpass(self, credentials_fpath: str) -> tuple:
         """
         Read ~/.pgpass file if it exists and extract Postgres credentials. Return tuple
@@ -74,21 +245,59 @@ class Postgres(object):
 
         return tuple(pgpass_contents)
 
-    def connect(self) -> sqlalchemy.engine.base.Connection:
+    def connect(self) -> 'sqlalchemy.engine.base.Engine':
         """
-        Connect to Postgres database and return the database connection.
+        Connect to Postgres database and return the database connection. If `share_engine`
+        is True, reuse an engine from the process-wide registry when one exists with the same
+        connection string and pool options.
         """
         con_str = f'postgresql://{self.pg_user}@{self.hostname}:{self.port}/{self.db_name}'
-        return sqlalchemy.create_engine(con_str)
+        engine_kwargs = dict(pool_size=self.pool_size,
+                             max_overflow=self.max_overflow,
+                             pool_pre_ping=self.pool_pre_ping,
+                             pool_recycle=self.pool_recycle)
+
+        if self.statement_timeout is not None:
+            engine_kwargs['connect_args'] = dict(options=f'-c statement_timeout={int(self.statement_timeout)}')
+
+        if not self.share_engine:
+            return sqlalchemy.create_engine(con_str, **engine_kwargs)
+
+        key = (con_str,
+               self.pool_size,
+               self.max_overflow,
+               self.pool_pre_ping,
+               self.pool_recycle,
+               self.statement_timeout)
+
+        with _engine_registry_lock:
+            engine = _engine_registry.get(key)
+            if engine is None:
+                engine = sqlalchemy.create_engine(con_str, **engine_kwargs)
+                _engine_registry[key] = engine
+
+        return engine
 
     def execute(self,
                 sql: str,
                 logfile: typing.Union[str, pathlib.Path]=None,
-                progress: bool=False) -> None:
+                progress: bool=False,
+                parallel: bool=False,
+                max_workers: int=4,
+                transaction: str='all',
+                log_stats: bool=False,
+                lock_timeout: int=10000) -> typing.Optional[list]:
         """
         Execute a SQL string or a list of SQL statements. Optionally control the logging of
         each individual SQL statement executed to a local log textfile with the `logfile`
-        parameter.
+        parameter. Log entries are buffered and written by a background thread, and are
+        flushed once the transaction is committed or rolled back. Set `log_stats` to record
+        each statement's duration and rowcount next to its timestamp.
+
+        By default, all statements are executed one after another in a single transaction.
+        Set `parallel` to spread independent statements across up to `max_workers` pooled
+        connections instead, in which case an ordered report is returned. See `_execute_parallel()`,
+        also for `lock_timeout`.
         """
         write_log = False if logfile is None else True
         if write_log:
@@ -96,31 +305,254 @@ class Postgres(object):
 
         sql = ensurelist(sql)
 
-        with self.dbcon.begin() as con:
-            if progress:
-                pbar = tqdm(total=len(sql), unit='query')
+        if parallel:
+            return self._execute_parallel(sql,
+                                          logfile=logfile,
+                                          progress=progress,
+                                          max_workers=max_workers,
+                                          transaction=transaction,
+                                          log_stats=log_stats,
+                                          lock_timeout=lock_timeout)
+
+        log_writer = BufferedLogWriter(logfile) if write_log else None
+        try:
+            with self.dbcon.begin() as con:
+                if progress:
+                    pbar = tqdm.tqdm(total=len(sql), unit='query')
 
-            for stmt in sql:
-                con.execute(sqlalchemy.text(stmt))
+                for stmt in sql:
+                    start = time.perf_counter()
+                    result = con.execute(sqlalchemy.text(stmt))
+                    duration = time.perf_counter() - start
 
-                if write_log:
-                    with open(logfile, 'a') as f:
-                        entry = stmt + '\n'
-                        entry = systime(as_string=True) + ' ' + entry  # Prepend timestamp
-                        f.write(entry)
+                    if write_log:
+                        log_writer.write(self._log_entry(stmt, duration, result.rowcount, log_stats))
 
-                if progress:
-                    pbar.update(1)
+                    if self.stats_sink is not None:
+                        self._record_query(stmt, duration, rows=result.rowcount, default_helper='execute')
+
+                    if progress:
+                        pbar.update(1)
+
+        finally:
+            # Flush log entries once the transaction has been committed or rolled back
+            if write_log:
+                log_writer.close()
 
         if progress:
             pbar.close()
 
-    def read_sql(self, sql: str, simplify: bool=True) -> typing.Union[pd.Series, pd.DataFrame]:
+    def _record_query(self,
+                      sql: str,
+                      duration: float,
+                      rows: int=None,
+                      nbytes: int=None,
+                      helper: str=None,
+                      default_helper: str=None) -> None:
+        """
+        Send a query instrumentation event to `self.stats_sink`. Unless given explicitly, the
+        helper is the outermost public `Postgres` method on the call stack.
+        """
+        if helper is None:
+            helper = self._calling_helper(default_helper)
+
+        self.stats_sink.record(dict(helper=helper,
+                                    sql=sql,
+                                    duration=duration,
+                                    rows=rows if rows is None or rows >= 0 else None,
+                                    bytes=nbytes))
+
+    def _calling_helper(self, default: str=None) -> str:
+        """
+        Get the name of the outermost public method of this instance on the current call stack,
+        i.e. `col_dtypes` when `col_dtypes()` calls `read_sql()`.
+        """
+        helper = default
+        frame = sys._getframe(1)
+        while frame is not None:
+            if not frame.f_code.co_name.startswith('_') and frame.f_locals.get('self') is self:
+                helper = frame.f_code.co_name
+
+            frame = frame.f_back
+
+        return helper
+
+    def _log_entry(self, stmt: str, duration: float, rowcount: int, log_stats: bool=False) -> str:
+        """
+        Format an entry in the SQL query log written by `execute()`.
+        """
+        entry = stmt + '\n'
+        if log_stats:
+            entry = f'[{duration:.6f}s, {rowcount} rows] ' + entry
+
+        return systime(as_string=True) + ' ' + entry  # Prepend timestamp
+
+    def _execute_parallel(self,
+                          sql: list,
+                          logfile: typing.Union[str, pathlib.Path]=None,
+                          progress: bool=False,
+                          max_workers: int=4,
+                          transaction: str='all',
+                          log_stats: bool=False,
+                          lock_timeout: int=10000) -> list:
+        """
+        Execute a list of independent SQL statements concurrently on a thread pool, with each
+        worker thread holding one pooled connection. The number of workers is capped by the
+        capacity of the connection pool.
+
+        Parameter `transaction` must be one of:
+
+            - 'all': each worker runs its statements in one transaction, and all workers'
+              transactions are committed together only if every statement succeeded. On the
+              first error, remaining statements are skipped, every transaction is rolled back
+              and the error is raised. A failure during the final commits themselves cannot
+              be undone on connections that have already committed.
+
+              Locks are held until the final commit, so a statement waiting for a lock held
+              by another worker's transaction would wait forever, unnoticed by the database's
+              deadlock detection. Each worker's transaction therefore gives up waiting for a
+              lock after `lock_timeout` milliseconds, failing the statement, or waits
+              indefinitely if `lock_timeout` is None. Statements touching the same rows or
+              tables should not be run in parallel.
+            - 'statement': each statement is committed in its own transaction. Errors are
+              recorded in the report and do not stop the remaining statements.
+
+        Return a report with one dictionary per statement, in input order, with keys `index`,
+        `sql`, `rowcount`, `duration` (seconds) and `error` (None if successful or not run).
+        """
+        assert transaction in ['all', 'statement'], "`transaction` must be one of 'all', 'statement'"
+
+        pool_capacity = self.pool_size + self.max_overflow if self.max_overflow >= 0 else len(sql)
+        max_workers = max(1, min(max_workers, len(sql), pool_capacity))
+
+        report = [dict(index=i, sql=stmt, rowcount=None, duration=None, error=None) for i, stmt in enumerate(sql)]
+        pending = queue.Queue()
+        for i in range(len(sql)):
+            pending.put(i)
+
+        lock = threading.Lock()
+        failed = threading.Event()
+        pbar = tqdm.tqdm(total=len(sql), unit='query') if progress else None
+
+        # Worker threads cannot see the caller's stack, so resolve the helper name here
+        helper = self._calling_helper('execute') if self.stats_sink is not None else None
+
+        def run_statement(con, i):
+            start = time.perf_counter()
+            try:
+                result = con.execute(sqlalchemy.text(sql[i]))
+                report[i]['rowcount'] = result.rowcount
+            finally:
+                report[i]['duration'] = time.perf_counter() - start
+
+            if log_writer is not None:
+                log_writer.write(self._log_entry(sql[i], report[i]['duration'], report[i]['rowcount'], log_stats))
+
+            if self.stats_sink is not None:
+                self._record_query(sql[i], report[i]['duration'], rows=report[i]['rowcount'], helper=helper)
+
+            if progress:
+                with lock:
+                    pbar.update(1)
+
+        def worker(con):
+            while not (transaction == 'all' and failed.is_set()):
+                try:
+                    i = pending.get_nowait()
+                except queue.Empty:
+                    break
+
+                if transaction == 'all':
+                    try:
+                        run_statement(con, i)
+                    except Exception as e:
+                        report[i]['error'] = e
+                        failed.set()
+                else:
+                    trans = con.begin()
+                    try:
+                        run_statement(con, i)
+                        trans.commit()
+                    except Exception as e:
+                        trans.rollback()
+                        report[i]['error'] = e
+
+        log_writer = BufferedLogWriter(logfile) if logfile is not None else None
+        connections = [self.dbcon.connect() for _ in range(max_workers)]
+        try:
+            transactions = [con.begin() for con in connections] if transaction == 'all' else []
+            if transaction == 'all' and lock_timeout is not None:
+                for con in connections:
+                    con.execute(sqlalchemy.text(f'set local lock_timeout = {int(lock_timeout)}'))
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(worker, connections))
+
+            if transaction == 'all':
+                if failed.is_set():
+                    for trans in transactions:
+                        trans.rollback()
+                else:
+                    for trans in transactions:
+                        trans.commit()
+
+        finally:
+            for con in connections:
+                con.close()
+
+            if log_writer is not None:
+                log_writer.close()
+
+            if progress:
+                pbar.close()
+
+        errors = [x for x in report if x['error'] is not None]
+        if len(errors):
+            logger.error(f'{len(errors)} of {len(sql)} statements failed, first error: {str(errors[0]["error"])}')
+            if transaction == 'all':
+                raise errors[0]['error']
+
+        return report
+
+    def read_sql(self,
+                 sql: str,
+                 simplify: bool=True,
+                 params: dict=None,
+                 chunksize: int=None,
+                 engine: str='pandas') -> typing.Union['pd.Series', 'pd.DataFrame', typing.Iterator]:
         """
         Execute SQL and read results using Pandas, optionally simplify result to a Series if
         the result is a single-column dataframe.
+
+        Optionally pass `params` to bind values to `:name` placeholders in `sql`, in which case
+        the values are sent to the database separately from the query text.
+
+        If `chunksize` is given, return an iterator of results of at most `chunksize` rows
+        each instead. See `read_sql_chunks()`.
+
+        Set `engine` to 'arrow' to decode results with `read_arrow()` and convert them to a
+        dataframe of NumPy-backed columns, without creating a Python object per value. Only
+        SELECT queries are accepted with `engine='arrow'`.
         """
-        res = pd.read_sql(sql, con=self.dbcon)
+        assert engine in ['pandas', 'arrow'], "`engine` must be one of 'pandas', 'arrow'"
+        if chunksize is not None:
+            assert engine == 'pandas', "`chunksize` is not supported with `engine='arrow'`"
+            return self.read_sql_chunks(sql, chunksize=chunksize, simplify=simplify, params=params)
+
+        start = time.perf_counter()
+        if engine == 'arrow':
+            res = self._read_arrow(sql, params=params).to_pandas()
+        elif params is None:
+            res = pd.read_sql(sql, con=self.dbcon)
+        else:
+            res = pd.read_sql(sqlalchemy.text(sql), con=self.dbcon, params=params)
+
+        if self.stats_sink is not None:
+            self._record_query(sql,
+                               time.perf_counter() - start,
+                               rows=len(res),
+                               nbytes=int(res.memory_usage(index=False, deep=True).sum()),
+                               default_helper='read_sql')
 
         if res.shape[1] == 1:
             if simplify:
@@ -129,6 +561,209 @@ class Postgres(object):
 
         return res
 
+    def read_sql_chunks(self,
+                        sql: str,
+                        chunksize: int=10000,
+                        simplify: bool=True,
+                        params: dict=None,
+                        as_tuples: bool=False) -> typing.Iterator[typing.Union['pd.Series', 'pd.DataFrame', list]]:
+        """
+        Execute SQL and yield results in chunks of at most `chunksize` rows. Rows are fetched
+        from a server-side cursor, `chunksize` rows per round trip, so only a single chunk is
+        held in memory at a time regardless of the size of the result.
+
+        Each chunk is a dataframe, simplified to a Series per chunk if `simplify` and the
+        result has a single column, or a list of row tuples if `as_tuples` is True.
+        """
+        assert chunksize > 0, '`chunksize` must be a positive integer'
+
+        # The generator body only runs on first iteration, when the calling helper may have
+        # returned already, so resolve it now
+        helper = self._calling_helper('read_sql_chunks') if self.stats_sink is not None else None
+        return self._read_sql_chunks(sql, chunksize, simplify=simplify, params=params, as_tuples=as_tuples, helper=helper)
+
+    def _read_sql_chunks(self,
+                         sql: str,
+                         chunksize: int,
+                         simplify: bool=True,
+                         params: dict=None,
+                         as_tuples: bool=False,
+                         helper: str=None) -> typing.Iterator[typing.Union['pd.Series', 'pd.DataFrame', list]]:
+        """
+        Generator behind `read_sql_chunks()`, crediting instrumentation events to `helper`.
+        """
+        instrument = self.stats_sink is not None
+        if instrument:
+            duration, nrows, nbytes = 0.0, 0, 0
+
+        with self.dbcon.connect() as con:
+            start = time.perf_counter()
+            result = con.execution_options(stream_results=True, max_row_buffer=chunksize) \
+                .execute(sqlalchemy.text(sql), params or {})
+
+            try:
+                columns = list(result.keys())
+                while True:
+                    rows = result.fetchmany(chunksize)
+                    if instrument:
+                        duration += time.perf_counter() - start
+                        nrows += len(rows)
+
+                    if not len(rows):
+                        break
+
+                    if as_tuples:
+                        res = [tuple(row) for row in rows]
+                    else:
+                        res = pd.DataFrame.from_records([tuple(row) for row in rows], columns=columns)
+                        if instrument:
+                            nbytes += int(res.memory_usage(index=False, deep=True).sum())
+
+                        if res.shape[1] == 1 and simplify:
+                            res = res.iloc[:, 0]
+
+                    yield res
+
+                    # Time spent by the consumer between chunks is not attributed to the query
+                    start = time.perf_counter()
+
+            finally:
+                result.close()
+                if instrument:
+                    self._record_query(sql, duration, rows=nrows, nbytes=nbytes or None, helper=helper)
+
+    def read_arrow(self, sql: str, params: dict=None, block_size: int=1 << 20) -> 'pyarrow.Table':
+        """
+        Execute SQL and read results into an Arrow table. Results are streamed from the
+        database with `COPY (<sql>) TO STDOUT` and parsed by Arrow's CSV reader in blocks of
+        `block_size` bytes, without creating a Python object per value. Requires `pyarrow`.
+
+        `sql` must be a single SELECT (or VALUES/TABLE) query, as it is wrapped in a subquery
+        and in COPY. A trailing semicolon is ignored. Other statements are rejected by the database.
+
+        Optionally pass `params` to bind values to `:name` placeholders in `sql`. Values are
+        escaped by the database driver and rendered into the query, as COPY does not accept
+        bind parameters.
+
+        Column types are taken from the result description. Numerics are read as float64,
+        and types without an Arrow counterpart as strings.
+        """
+        start = time.perf_counter()
+        res = self._read_arrow(sql, params=params, block_size=block_size)
+
+        if self.stats_sink is not None:
+            self._record_query(sql,
+                               time.perf_counter() - start,
+                               rows=res.num_rows,
+                               nbytes=res.nbytes,
+                               default_helper='read_arrow')
+
+        return res
+
+    def _read_arrow(self, sql: str, params: dict=None, block_size: int=1 << 20) -> 'pyarrow.Table':
+        """
+        Execute SQL and read results into an Arrow table, without instrumentation. See
+        `read_arrow()`.
+        """
+        pa = _import_optional('pyarrow', 'read_arrow()', extra='pyarrow')
+        pacsv = _import_optional('pyarrow.csv', 'read_arrow()', extra='pyarrow')
+
+        raw_con = self.dbcon.raw_connection()
+        try:
+            cursor = raw_con.cursor()
+            if params is not None:
+                compiled = sqlalchemy.text(sql).bindparams(**params).compile(dialect=self.dbcon.dialect)
+                sql = cursor.mogrify(str(compiled), compiled.params).decode(raw_con.encoding)
+
+            sql = sql.strip().rstrip(';')
+
+            # Render timestamps in a format parsed by Arrow regardless of session settings
+            cursor.execute("set local timezone = 'UTC'")
+            cursor.execute('set local datestyle = iso')
+
+            # Get column names and types without running the query. Columns are read under
+            # positional names and renamed afterwards, as output names need not be unique. The
+            # query is wrapped on lines of its own in case it ends with a `--` comment
+            cursor.execute(f'select * from (\n{sql}\n) as q limit 0')
+            names = [x.name for x in cursor.description]
+            positional_names = [f'c{i}' for i in range(len(names))]
+            column_types = {positional_names[i]: self._arrow_type_oid(x.type_code)
+                            for i, x in enumerate(cursor.description)}
+
+            read_fd, write_fd = os.pipe()
+            errors = []
+
+            def copy_to_pipe():
+                with os.fdopen(write_fd, 'wb') as f:
+                    try:
+                        cursor.copy_expert(f'copy (\n{sql}\n) to stdout with (format csv)', f)
+                    except BrokenPipeError:
+                        pass
+                    except Exception as e:
+                        errors.append(e)
+
+            writer = threading.Thread(target=copy_to_pipe, daemon=True)
+            writer.start()
+
+            with os.fdopen(read_fd, 'rb') as f:
+                try:
+                    if not len(f.peek(1)):
+                        # COPY writes nothing for an empty result, which Arrow's CSV reader rejects
+                        schema = pa.schema([(x, column_types[x]) for x in positional_names])
+                        res = schema.empty_table().rename_columns(names)
+                    else:
+                        # NULL is an unquoted empty field in CSV format, and an empty string a quoted one
+                        reader = pacsv.open_csv(
+                            f,
+                            read_options=pacsv.ReadOptions(column_names=positional_names, block_size=block_size),
+                            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+                            convert_options=pacsv.ConvertOptions(column_types=column_types,
+                                                                 null_values=[''],
+                                                                 strings_can_be_null=True,
+                                                                 quoted_strings_can_be_null=False,
+                                                                 true_values=['t'],
+                                                                 false_values=['f']))
+                        res = reader.read_all().rename_columns(names)
+                finally:
+                    # Closing the read end unblocks the writer if reading failed, and an error
+                    # in the COPY itself takes precedence over the resulting read error
+                    f.close()
+                    writer.join()
+                    if len(errors):
+                        raise errors[0]
+
+            raw_con.rollback()
+
+        except Exception:
+            raw_con.rollback()
+            raise
+
+        finally:
+            raw_con.close()
+
+        return res
+
+    def _arrow_type_oid(self, oid: int) -> typing.Any:
+        """
+        Get the Arrow type of a result column from the OID of its Postgres type. Types
+        without an Arrow counterpart are read as strings.
+        """
+        pa = _import_optional('pyarrow', 'read_arrow()', extra='pyarrow')
+
+        return {
+            16: pa.bool_(),
+            20: pa.int64(),
+            21: pa.int16(),
+            23: pa.int32(),
+            26: pa.int64(),
+            700: pa.float32(),
+            701: pa.float64(),
+            1700: pa.float64(),
+            1082: pa.date32(),
+            1114: pa.timestamp('us'),
+            1184: pa.timestamp('us', tz='UTC'),
+        }.get(oid, pa.string())
+
     def get_table_name(self, schema_name: str=None, table_name: str=None) -> str:
         """
         Concatenate a schema and table names. Require that `table_name` is supplied,
@@ -154,25 +789,19 @@ class Postgres(object):
         table_schema_and_name = self.get_table_name(schema_name, table_name)
         full_col = table_schema_and_name + '.' + col
 
-        infoschema = self.infoschema(infoschema_table='columns')[['table_schema', 'table_name', 'column_name', 'data_type', 'is_nullable']]
-        infoschema = infoschema.loc[
-            (infoschema['table_schema']==schema_name)
-            & (infoschema['table_name']==table_name)
-            & (infoschema['column_name']==col)
-        ]
-
-        assert len(infoschema), f'Nonexistent column {full_col}'
-        infoschema = infoschema.squeeze().to_dict()
+        table_columns = self._table_columns(schema_name, table_name)
+        assert col in table_columns, f'Nonexistent column {full_col}'
+        col_metadata = table_columns[col]
 
         if val == 'NULL' or val is None:
-            if bool(infoschema['is_nullable']) is True:
+            if bool(col_metadata['is_nullable']) is True:
                 return True
             else:
                 logger.error(f"Value 'NULL' (dtype: {val.__class__.__name__}) not allowed for column {full_col}")
                 return False
 
         # Check that input value datatype matches queried table column datatype
-        dtype = self.col_dtypes(schema_name, table_name)[col]
+        dtype = col_metadata['data_type']
         dtype_map = {
             'bigint': 'int',
             'int8': 'int',
@@ -269,7 +898,7 @@ class Postgres(object):
         logger.debug(msg)
         return False
 
-    def infoschema(self, infoschema_table: str) -> pd.DataFrame:
+    def infoschema(self, infoschema_table: str) -> 'pd.DataFrame':
         """
         Query from information_schema. Vanilla call to this function executes:
 
@@ -335,13 +964,7 @@ class Postgres(object):
                     dtype = type(val).__name__
                     raise Exception(f'Dtype mismatch. Value: {val}, dtype: {dtype}, column: {col}')
 
-            if str(val).lower() in self.null_equivalents:
-                val = 'NULL'
-            elif assert_value_dtype(val, 'bool') or assert_value_dtype(val, 'int') or assert_value_dtype(val, 'float'):
-                pass
-            else:
-                # Assume string
-                val = self._single_quote(val)
+            val = self._render_value(val, null='NULL')
 
             if newlines:
                 lst.append(f'\n    "{col}"={str(val)}')
@@ -401,16 +1024,7 @@ class Postgres(object):
                     raise Exception(f"""Value '{val}' (dtype: {dtype})
                     is incompatible with column '{col}' """)
 
-            if str(val).lower() in self.null_equivalents:
-                val = 'null'
-
-            elif assert_value_dtype(val, 'bool') or assert_value_dtype(val, 'int') or assert_value_dtype(val, 'float'):
-                pass
-            else:
-                # Assume string, handle quotes
-                val = self._single_quote(val)
-
-            lst.append(val)
+            lst.append(self._render_value(val, null='null'))
 
         values_final = ', '.join(str(x) for x in lst)
         values_final = values_final.replace("'null'", 'null')
@@ -422,6 +1036,220 @@ class Postgres(object):
 
         return sql.format(**locals())
 
+    def build_insert_many(self,
+                          schema_name: str,
+                          table_name: str,
+                          columns: list=None,
+                          rows: typing.Union[typing.Iterable[typing.Sequence], 'pd.DataFrame']=None,
+                          chunksize: int=1000,
+                          max_statement_bytes: int=16 * 1024 ** 2,
+                          validate: bool=False,
+                          newlines: bool=False) -> list:
+        """
+        Construct a list of multi-row SQL INSERT statements. Values are rendered with the same
+        null equivalent and quoting rules as `build_insert()`.
+
+        Each statement holds at most `chunksize` rows, at most `PG_MAX_BIND_PARAMS` values and
+        at most roughly `max_statement_bytes` bytes of SQL text, whichever limit is hit first.
+        A single row larger than `max_statement_bytes` is still emitted as its own statement.
+
+        schema {str} name of schema
+        table {str} SQL table name
+        columns {list} columns to consider in INSERT statements, selected by name from `rows` if a dataframe, defaults to all of its columns
+        rows {iterable or pd.DataFrame} row sequences with one value per entry in `columns`, or a dataframe
+        chunksize {int} maximum number of rows per statement
+        max_statement_bytes {int} approximate maximum size of each statement
+        validate {bool} validate that each value may be inserted to destination column
+        newlines {true} add newlines to query string to make more human-readable
+
+        Dataframes are rendered column by column with `render_literals()` unless `validate`
+        is True, in which case each value is validated and rendered individually.
+        """
+        if _is_dataframe(rows):
+            if columns is None:
+                columns = list(rows.columns)
+            else:
+                columns = ensurelist(columns)
+                rows = rows[columns]
+
+            if not validate:
+                row_strs = self._render_dataframe_rows(rows)
+            else:
+                rows = rows.itertuples(index=False, name=None)
+
+        assert columns is not None, 'Must supply `columns`'
+        assert rows is not None, 'Must supply `rows`'
+        columns = ensurelist(columns)
+        chunksize = max(1, min(chunksize, PG_MAX_BIND_PARAMS // len(columns)))
+
+        if not _is_dataframe(rows):
+            row_strs = self._render_rows(schema_name, table_name, columns, rows, validate=validate)
+
+        table_schema_and_name = self.get_table_name(schema_name, table_name)
+        columns_str = ', '.join(['"' + x + '"' for x in columns])
+        prefix = f'insert into {table_schema_and_name} ({columns_str})' + ('\nvalues ' if newlines else ' values ')
+        row_sep = ',\n       ' if newlines else ', '
+
+        statements = []
+        chunk = []
+        chunk_bytes = len(prefix)
+        for row_str in row_strs:
+            row_bytes = len(row_str.encode('utf-8')) + len(row_sep)
+
+            if len(chunk) and (len(chunk) >= chunksize or chunk_bytes + row_bytes > max_statement_bytes):
+                statements.append(prefix + row_sep.join(chunk))
+                chunk = []
+                chunk_bytes = len(prefix)
+
+            chunk.append(row_str)
+            chunk_bytes += row_bytes
+
+        if len(chunk):
+            statements.append(prefix + row_sep.join(chunk))
+
+        return statements
+
+    def build_upsert(self,
+                     schema_name: str,
+                     table_name: str,
+                     conflict_columns: list,
+                     columns: list=None,
+                     rows: typing.Union[typing.Iterable[typing.Sequence], 'pd.DataFrame']=None,
+                     update_columns: list=None,
+                     do_nothing: bool=False,
+                     chunksize: int=1000,
+                     max_statement_bytes: int=16 * 1024 ** 2,
+                     validate: bool=False,
+                     newlines: bool=False) -> list:
+        """
+        Construct a list of multi-row `INSERT ... ON CONFLICT` statements. Rows are batched
+        and rendered as in `build_insert_many()`. Rows conflicting with an existing row on
+        `conflict_columns`, which must match a unique index or constraint, update that row's
+        `update_columns` instead, or are skipped if `do_nothing` is True.
+
+        A statement may not update the same row twice, so each batch must not hold several
+        rows with the same key.
+
+        conflict_columns {list} columns of the unique index or constraint to test for conflicts
+        update_columns {list} columns to update on conflict, defaults to all `columns` but `conflict_columns`
+        do_nothing {bool} skip conflicting rows instead of updating them
+        """
+        if _is_dataframe(rows) and columns is None:
+            columns = list(rows.columns)
+
+        statements = self.build_insert_many(schema_name,
+                                            table_name,
+                                            columns=columns,
+                                            rows=rows,
+                                            chunksize=chunksize,
+                                            max_statement_bytes=max_statement_bytes,
+                                            validate=validate,
+                                            newlines=newlines)
+
+        on_conflict = self._on_conflict_sql(columns, conflict_columns, update_columns, do_nothing=do_nothing)
+        return [x + ('\n' if newlines else ' ') + on_conflict for x in statements]
+
+    def _on_conflict_sql(self,
+                         columns: list,
+                         conflict_columns: list,
+                         update_columns: list=None,
+                         do_nothing: bool=False) -> str:
+        """
+        Construct the `ON CONFLICT` clause of an upsert. Falls back to `DO NOTHING` if there
+        is no column to update.
+        """
+        columns = ensurelist(columns)
+        conflict_columns = ensurelist(conflict_columns)
+        missing = [x for x in conflict_columns if x not in columns]
+        assert not len(missing), f'Conflict column(s) {missing} must be among `columns`'
+
+        if update_columns is None:
+            update_columns = [x for x in columns if x not in conflict_columns]
+
+        conflict_str = ', '.join(['"' + x + '"' for x in conflict_columns])
+        if do_nothing or not len(ensurelist(update_columns)):
+            return f'on conflict ({conflict_str}) do nothing'
+
+        set_str = ', '.join([f'"{x}" = excluded."{x}"' for x in ensurelist(update_columns)])
+        return f'on conflict ({conflict_str}) do update set {set_str}'
+
+    def render_literals(self, values: typing.Union['pd.Series', typing.Sequence], null: str='null') -> 'pd.Series':
+        """
+        Render a column of values as SQL literals in a single vectorized pass, following the
+        same rules as the statement builders: null equivalents become `null`, booleans and
+        numerics are left unquoted and all other values are quoted as strings. Columns of
+        boolean, integer, float and datetime dtype are rendered without classifying each value.
+
+        values {pd.Series, np.ndarray or list} column of values
+        null {str} literal used for null values
+        """
+        s = values if isinstance(values, pd.Series) else pd.Series(values)
+        notna = s.notna()
+        kind = s.dtype.kind
+
+        if kind == 'b':
+            return s.map({True: 'True', False: 'False'}).where(notna, null)
+        elif kind in ['i', 'u', 'f']:
+            return s.astype(str).where(notna, null)
+        elif kind == 'M':
+            # Format each Timestamp as `str()` does in `_render_value()`, as `astype(str)` drops
+            # the time of day when every value is at midnight
+            return ("'" + s.map(str) + "'").where(notna, null)
+
+        # Object and other dtypes, classify every value by its type and string representation
+        st = s.astype(str)
+        lower = st.str.lower()
+        null_mask = ~notna | lower.isin([x.lower() for x in self.null_equivalents])
+
+        unquoted = s.map(_is_number).astype(bool) \
+            | lower.isin(['true', 't', 'yes', 'y', 'false', 'f', 'no', 'n']) \
+            | st.str.match(r'^\s*[-+]?\d+(_\d+)*\s*$') \
+            | (st.str.contains('.', regex=False) & pd.to_numeric(st.str.strip(), errors='coerce').notna())
+
+        rendered = st.where(unquoted, "'" + st.str.replace("'", "''", regex=False) + "'")
+        return rendered.where(~null_mask, null)
+
+    def _render_rows(self,
+                     schema_name: str,
+                     table_name: str,
+                     columns: list,
+                     rows: typing.Iterable[typing.Sequence],
+                     validate: bool=False) -> typing.Iterator[str]:
+        """
+        Render row sequences as parenthesized SQL VALUES tuples, one value at a time.
+        """
+        for row in rows:
+            row = list(row)
+            if len(row) != len(columns):
+                raise Exception("Each row must have as many values as there are `columns`")
+
+            lst = []
+            for col, val in zip(columns, row):
+                if validate:
+                    test = self.validate_dtype(schema_name, table_name, col, val)
+                    if not test:
+                        dtype = type(val).__name__
+                        raise Exception(f"""Value '{val}' (dtype: {dtype})
+                        is incompatible with column '{col}' """)
+
+                lst.append(self._render_value(val, null='null'))
+
+            yield '(' + ', '.join(str(x) for x in lst).replace("'null'", 'null') + ')'
+
+    def _render_dataframe_rows(self, df: 'pd.DataFrame') -> typing.Iterator[str]:
+        """
+        Render dataframe rows as parenthesized SQL VALUES tuples, one column at a time.
+        """
+        if not len(df.columns) or not len(df):
+            return iter([])
+
+        rendered = [self.render_literals(df.iloc[:, i], null='null') for i in range(df.shape[1])]
+        row_strs = rendered[0]
+        for col_strs in rendered[1:]:
+            row_strs = row_strs + ', ' + col_strs
+
+        return iter(('(' + row_strs + ')').tolist())
+
     def build_delete(self,
                      schema_name: str,
                      table_name: str,
@@ -444,89 +1272,764 @@ class Postgres(object):
         sql = '\n'.join(sql) if newlines else ' '.join(sql)
         return sql.format(table_schema_and_name, pkey_name, pkey_value_str)
 
-    def col_names(self, schema_name: str, table_name: str) -> list:
+    def build_delete_many(self,
+                          schema_name: str,
+                          table_name: str,
+                          pkey_name: str,
+                          pkey_values: typing.Iterable,
+                          chunksize: int=1000,
+                          newlines: bool=False) -> list:
         """
-        Get column names of table as a list.
+        Construct a list of SQL DELETE FROM statements, each deleting at most `chunksize`
+        of `pkey_values` as in `build_delete()`.
         """
-        df_cols = self.infoschema(infoschema_table='columns')[['table_schema', 'table_name', 'column_name']]
+        assert chunksize > 0, '`chunksize` must be a positive integer'
+        pkey_values = self._key_list(pkey_values)
+        return [self.build_delete(schema_name, table_name, pkey_name, pkey_values[i:i + chunksize], newlines=newlines)
+                for i in range(0, len(pkey_values), chunksize)]
 
-        df_cols = df_cols.loc[(df_cols['table_schema'] == schema_name)
-                              & (df_cols['table_name'] == table_name)]
+    def _key_list(self, values: typing.Iterable) -> list:
+        """
+        Convert an iterable of key values, i.e. a Series, to a list of Python values.
+        """
+        return values.tolist() if hasattr(values, 'tolist') else list(values)
 
-        cols = df_cols['column_name'].tolist()
-        return cols
+    def col_names(self, schema_name: str, table_name: str) -> list:
+        """
+        Get column names of table as a list.
+        """
+        return list(self._table_columns(schema_name, table_name))
 
-    def col_dtypes(self, schema_name: str, table_name: str) -> int:
+    def col_dtypes(self, schema_name: str, table_name: str) -> dict:
         """
         Get column datatypes of table as a dictionary.
         """
-        infoschema = self.infoschema(infoschema_table='columns')
-        infoschema = infoschema.loc[
-            (infoschema['table_schema']==schema_name)
-            & (infoschema['table_name']==table_name)
-        ]
-        return infoschema.set_index('column_name')['data_type'].to_dict()
+        table_columns = self._table_columns(schema_name, table_name)
+        return {col: metadata['data_type'] for col, metadata in table_columns.items()}
 
-    def read_table(self, schema_name: str, table_name: str) -> pd.DataFrame:
+    def invalidate_metadata(self, schema_name: str=None, table_name: str=None) -> None:
         """
-        Read an entire SQL table or view as a dataframe.
+        Drop cached column metadata. With no arguments, clear the entire cache. With only
+        `schema_name`, clear every cached table in that schema. With both, clear a single table.
         """
-        df = self.read_sql(f'select * from "{schema_name}"."{table_name}"')
-        logger.info(f"Read dataframe {schema_name}.{table_name}, shape: {df.shape}")
-        return df
+        if schema_name is None and table_name is None:
+            self._metadata_cache.clear()
+            return
 
-    def dump(self, backup_dir: typing.Union[str, pathlib.Path])-> str:
-        """
-        Wrap `pg_dump` and save an entire database contents to a directory.
+        for key in list(self._metadata_cache):
+            if key[0] == schema_name and (table_name is None or key[1] == table_name):
+                self._metadata_cache.pop(key, None)
+
+    def _table_columns(self, schema_name: str, table_name: str) -> dict:
         """
-        backup_dir = os.path.expanduser(backup_dir)
-        logger.info(f'Dumping database {self.db_name} to "{backup_dir}"')
+        Get column metadata of a table as an ordered dictionary in format:
 
-        bin = find_binary('pg_dump', abort=True)
-        output_fpath = f'{backup_dir}/{self.db_name}.sql'
-        cmd = f'{bin} --user {self.pg_user} {self.db_name} > "{output_fpath}"'
+            {column_name: {'data_type': ..., 'full_data_type': ..., 'is_nullable': ...}, ...}
 
-        out = syscmd(cmd, encoding='utf-8')
-        if not isinstance(out, int):
-            if 'FATAL' in out:
-                raise Exception(out.strip())
+        Results are served from the per-instance metadata cache when a fresh entry exists.
+        """
+        table_columns = self._cached_table_columns(schema_name, table_name)
+        if table_columns is not None:
+            return table_columns
 
-        return output_fpath
+        params = dict(schema_name=schema_name, table_name=table_name)
+        df = self.read_sql(TABLE_COLUMNS_SQL, simplify=False, params=params)
+        return self._cache_table_columns(schema_name, table_name, df)
 
-    def dump_tables(self, backup_dir: typing.Union[str, pathlib.Path], sep: str=',', coerce_csv: bool=False):
+    def _cached_table_columns(self, schema_name: str, table_name: str) -> typing.Optional[dict]:
         """
-        Dump each table in database to a textfile with specified separator.
+        Get column metadata of a table from the metadata cache, or None if no fresh entry exists.
+        """
+        cached = self._metadata_cache.get((schema_name, table_name))
+        if cached is not None:
+            fetched_at, table_columns = cached
+            if self.metadata_ttl is None or time.monotonic() - fetched_at < self.metadata_ttl:
+                return table_columns
 
-        Source: https://stackoverflow.com/questions/17463299/export-database-into-csv-file?answertab=oldest#tab-top
+        return None
+
+    def _cache_table_columns(self, schema_name: str, table_name: str, df: 'pd.DataFrame') -> dict:
         """
-        db_to_csv = """
-        CREATE OR REPLACE FUNCTION db_to_csv(path TEXT) RETURNS void AS $$
-        DECLARE
-           tables RECORD;
-           statement TEXT;
-        BEGIN
-        FOR tables IN
-           SELECT ('"' || table_schema || '"' || '.' || '"' || table_name || '"') AS schema_table
-           FROM information_schema.tables t
-               INNER JOIN information_schema.schemata s ON s.schema_name = t.table_schema
-           WHERE t.table_schema NOT IN ('pg_catalog', 'information_schema')
-               AND t.table_type NOT IN ('VIEW')
-           ORDER BY schema_table
-        LOOP
-           statement := 'COPY ' || tables.schema_table || ' TO ''' || path || '/' || replace(tables.schema_table, '"', '') || '.csv' ||''' DELIMITER ''{sep}'' CSV HEADER';
-           EXECUTE statement;
-        END LOOP;
-        RETURN;
-        END;
-        $$ LANGUAGE plpgsql;""".format(**locals())
-        self.execute(db_to_csv)
+        Store the result of `TABLE_COLUMNS_SQL` in the metadata cache and return it in the
+        format of `_table_columns()`.
+        """
+        logger.info(f'Retrieved column metadata for {schema_name}.{table_name}')
 
-        # Execute function, dumping each table to a textfile.
-        # Function is used as follows: SELECT db_to_csv('/path/to/dump/destination');
-        logger.info(f'Dumping database {self.db_name} to "{backup_dir}" as tables stored as textfiles')
-        self.execute(f"select db_to_csv('{backup_dir}')")
+        table_columns = {}
+        for row in df.itertuples(index=False):
+            table_columns[row.column_name] = dict(data_type=row.data_type,
+                                                  full_data_type=row.full_data_type,
+                                                  is_nullable=bool(row.is_nullable))
 
-        # If coerce_csv is True, read in each file outputted, then write as a quoted CSV.
+        if self.metadata_ttl != 0 and len(table_columns):
+            self._metadata_cache[(schema_name, table_name)] = (time.monotonic(), table_columns)
+
+        return table_columns
+
+    def copy_from_rows(self,
+                       rows: typing.Iterable[typing.Sequence],
+                       schema_name: str,
+                       table_name: str,
+                       columns: list,
+                       bufsize: int=65536,
+                       null_equivalents: bool=True) -> int:
+        """
+        Bulk load an iterable of row sequences into a table with `COPY ... FROM STDIN`.
+        Rows are rendered to CSV lazily as the database consumes them, so memory use is
+        bounded regardless of the number of rows. Values are converted according to the
+        (cached) column datatypes of the destination table, and values matching a null
+        equivalent are loaded as NULL, as in `build_insert()`. Return the number of rows loaded.
+
+        rows {iterable} row sequences, each with one value per entry in `columns`
+        schema_name {str} name of schema
+        table_name {str} SQL table name
+        columns {list} destination columns, in the order of values in each row
+        bufsize {int} number of characters sent to the database per read
+        null_equivalents {bool} if False, load only None as NULL and all other values as is
+        """
+        columns = ensurelist(columns)
+        start = time.perf_counter()
+        raw_con = self.dbcon.raw_connection()
+        try:
+            cursor = raw_con.cursor()
+            rowcount = self._copy_rows(cursor, schema_name, table_name, columns, rows,
+                                       bufsize=bufsize, null_equivalents=null_equivalents)
+            raw_con.commit()
+        except Exception:
+            raw_con.rollback()
+            raise
+        finally:
+            raw_con.close()
+
+        if self.stats_sink is not None:
+            self._record_query(f'copy {schema_name}.{table_name} from stdin',
+                               time.perf_counter() - start,
+                               rows=rowcount,
+                               default_helper='copy_from_rows')
+
+        logger.info(f'Copied {rowcount} rows to {schema_name}.{table_name}')
+        return rowcount
+
+    def copy_from_dataframe(self,
+                            df: 'pd.DataFrame',
+                            schema_name: str,
+                            table_name: str,
+                            columns: list=None,
+                            bufsize: int=65536) -> int:
+        """
+        Bulk load a dataframe into a table with `COPY ... FROM STDIN`. Dataframe columns are
+        matched to destination columns by name unless `columns` is given. See `copy_from_rows()`.
+        """
+        columns = list(df.columns) if columns is None else ensurelist(columns)
+        rows = df.itertuples(index=False, name=None)
+        return self.copy_from_rows(rows, schema_name, table_name, columns, bufsize=bufsize)
+
+    def bulk_update(self,
+                    df: 'pd.DataFrame',
+                    schema_name: str,
+                    table_name: str,
+                    pkey_name: str,
+                    columns: list=None,
+                    chunksize: int=100000,
+                    bufsize: int=65536) -> int:
+        """
+        Update many rows of a table from a dataframe in a single statement. Rows are staged
+        into a temporary table with `COPY`, `chunksize` rows per COPY, and applied to the table
+        with one `UPDATE ... FROM` join on the primary key, all in one transaction. Return the
+        number of rows updated.
+
+        Values are converted as in `copy_from_rows()`. If the dataframe holds several rows with
+        the same primary key, which one is applied is undefined.
+
+        df {pd.DataFrame} rows to update, with a column for the primary key
+        schema_name {str} name of schema
+        table_name {str} SQL table name
+        pkey_name {str} name of primary key in table
+        columns {list} columns to update, defaults to all dataframe columns but the primary key
+        chunksize {int} number of rows staged per COPY
+        bufsize {int} number of characters sent to the database per read
+        """
+        assert pkey_name in df.columns, f'Primary key `{pkey_name}` is not a column of the dataframe'
+        assert chunksize > 0, '`chunksize` must be a positive integer'
+
+        columns = [x for x in df.columns if x != pkey_name] if columns is None else ensurelist(columns)
+        assert len(columns), 'Must provide at least one column to update'
+
+        stage_columns = [pkey_name] + columns
+        set_str = ', '.join([f'"{x}" = s."{x}"' for x in columns])
+
+        start = time.perf_counter()
+        raw_con = self.dbcon.raw_connection()
+        try:
+            cursor = raw_con.cursor()
+            rows = df[stage_columns].itertuples(index=False, name=None)
+            staged = self._stage_rows(cursor, schema_name, table_name, stage_columns, rows, 'bulk_update_stage',
+                                      chunksize=chunksize, bufsize=bufsize)
+            cursor.execute(f'update "{schema_name}"."{table_name}" as t set {set_str} '
+                           f'from "bulk_update_stage" as s where t."{pkey_name}" = s."{pkey_name}"')
+            rowcount = cursor.rowcount
+            raw_con.commit()
+
+        except Exception:
+            raw_con.rollback()
+            raise
+
+        finally:
+            raw_con.close()
+
+        if self.stats_sink is not None:
+            self._record_query(f'update {schema_name}.{table_name} from staged rows',
+                               time.perf_counter() - start,
+                               rows=rowcount,
+                               default_helper='bulk_update')
+
+        logger.info(f'Updated {rowcount} rows of {schema_name}.{table_name} from {staged} staged rows')
+        return rowcount
+
+    def upsert(self,
+               rows: typing.Union[typing.Iterable[typing.Sequence], 'pd.DataFrame'],
+               schema_name: str,
+               table_name: str,
+               conflict_columns: list,
+               columns: list=None,
+               update_columns: list=None,
+               do_nothing: bool=False,
+               method: str='values',
+               chunksize: int=None,
+               bufsize: int=65536) -> dict:
+        """
+        Insert rows into a table, updating or skipping rows that conflict with existing rows
+        on `conflict_columns`, in a single transaction. See `build_upsert()` for the conflict
+        handling parameters. Return a dictionary with the number of rows `inserted` and
+        `updated`, where rows skipped with `do_nothing` count as neither.
+
+        Parameter `method` must be one of:
+
+            - 'values': execute multi-row statements from `build_upsert()`, each holding at
+              most `chunksize` rows (default 1000).
+            - 'copy': stage all rows into a temporary table with COPY, `chunksize` rows per
+              COPY (default 100000), and upsert them with a single `INSERT ... SELECT`. Faster
+              for many rows, and values are converted as in `copy_from_rows()`.
+
+        rows {iterable or pd.DataFrame} row sequences with one value per entry in `columns`, or a dataframe
+        columns {list} columns to insert, defaults to columns of `rows` if a dataframe
+        """
+        assert method in ['values', 'copy'], "`method` must be one of 'values', 'copy'"
+        if _is_dataframe(rows):
+            columns = list(rows.columns) if columns is None else ensurelist(columns)
+            rows = rows[columns].itertuples(index=False, name=None)
+
+        assert columns is not None, 'Must supply `columns`'
+        columns = ensurelist(columns)
+        on_conflict = self._on_conflict_sql(columns, conflict_columns, update_columns, do_nothing=do_nothing)
+
+        def count_sql(insert_sql):
+            # xmax of a row version is 0 if it was inserted, and set if it was updated
+            return (f'with upserted as ({insert_sql} returning (xmax = 0) as inserted) '
+                    'select count(*) filter (where inserted) as inserted, '
+                    'count(*) filter (where not inserted) as updated from upserted')
+
+        counts = dict(inserted=0, updated=0)
+        start = time.perf_counter()
+        if method == 'values':
+            statements = self.build_upsert(schema_name,
+                                           table_name,
+                                           conflict_columns,
+                                           columns=columns,
+                                           rows=rows,
+                                           update_columns=update_columns,
+                                           do_nothing=do_nothing,
+                                           chunksize=chunksize or 1000)
+            with self.dbcon.begin() as con:
+                for stmt in statements:
+                    inserted, updated = con.execute(sqlalchemy.text(count_sql(stmt))).fetchone()
+                    counts['inserted'] += inserted
+                    counts['updated'] += updated
+
+        else:
+            column_str = ', '.join(['"' + x + '"' for x in columns])
+            raw_con = self.dbcon.raw_connection()
+            try:
+                cursor = raw_con.cursor()
+                self._stage_rows(cursor, schema_name, table_name, columns, rows, 'upsert_stage',
+                                 chunksize=chunksize or 100000, bufsize=bufsize)
+                cursor.execute(count_sql(f'insert into "{schema_name}"."{table_name}" ({column_str}) '
+                                         f'select {column_str} from "upsert_stage" {on_conflict}'))
+                counts['inserted'], counts['updated'] = cursor.fetchone()
+                raw_con.commit()
+
+            except Exception:
+                raw_con.rollback()
+                raise
+
+            finally:
+                raw_con.close()
+
+        if self.stats_sink is not None:
+            self._record_query(f'upsert {schema_name}.{table_name}',
+                               time.perf_counter() - start,
+                               rows=counts['inserted'] + counts['updated'],
+                               default_helper='upsert')
+
+        logger.info(f"Upserted into {schema_name}.{table_name}: {counts['inserted']} inserted, {counts['updated']} updated")
+        return counts
+
+    def delete_many(self,
+                    schema_name: str,
+                    table_name: str,
+                    pkey_name: str,
+                    pkey_values: typing.Iterable,
+                    method: str='any',
+                    chunksize: int=10000,
+                    parallel: bool=False,
+                    max_workers: int=4) -> int:
+        """
+        Delete the rows of a table matching any of a large number of primary key values, and
+        return the number of rows deleted.
+
+        Parameter `method` must be one of:
+
+            - 'any': delete `chunksize` keys per statement with `where pkey = any(:keys)`, the
+              keys being sent as a single array parameter.
+            - 'in': delete `chunksize` keys per statement with literal `where pkey in (...)`
+              lists, as rendered by `build_delete_many()`.
+            - 'stage': stage all keys into a temporary table with COPY, `chunksize` keys per
+              COPY, and delete with a single `DELETE ... USING` join in one transaction.
+
+        With 'any' and 'in', each statement is committed on its own so that locks are held
+        briefly, and with `parallel` statements run on up to `max_workers` pooled connections
+        at once. If a statement fails, the error is raised and statements already committed
+        are not rolled back.
+        """
+        assert method in ['any', 'in', 'stage'], "`method` must be one of 'any', 'in', 'stage'"
+        assert chunksize > 0, '`chunksize` must be a positive integer'
+        pkey_values = self._key_list(pkey_values)
+        table_schema_and_name = f'"{schema_name}"."{table_name}"'
+        start = time.perf_counter()
+
+        if method == 'stage':
+            raw_con = self.dbcon.raw_connection()
+            try:
+                cursor = raw_con.cursor()
+                self._stage_rows(cursor, schema_name, table_name, [pkey_name], ([x] for x in pkey_values),
+                                 'delete_stage', chunksize=chunksize)
+                cursor.execute(f'delete from {table_schema_and_name} as t using "delete_stage" as s '
+                               f'where t."{pkey_name}" = s."{pkey_name}"')
+                rowcount = cursor.rowcount
+                raw_con.commit()
+
+            except Exception:
+                raw_con.rollback()
+                raise
+
+            finally:
+                raw_con.close()
+
+        else:
+            if method == 'in':
+                batches = [(sql, None) for sql in self.build_delete_many(schema_name, table_name, pkey_name,
+                                                                          pkey_values, chunksize=chunksize)]
+            else:
+                # Cast the array to the key's type, as it is otherwise inferred from the values
+                dtype = self.col_dtypes(schema_name, table_name)[pkey_name]
+                sql = f'delete from {table_schema_and_name} where "{pkey_name}" = any(cast(:pkey_values as {dtype}[]))'
+                batches = [(sql, dict(pkey_values=pkey_values[i:i + chunksize]))
+                           for i in range(0, len(pkey_values), chunksize)]
+
+            def run_batch(batch):
+                sql, params = batch
+                with self.dbcon.begin() as con:
+                    return con.execute(sqlalchemy.text(sql), params or {}).rowcount
+
+            if parallel and len(batches) > 1:
+                pool_capacity = self.pool_size + self.max_overflow if self.max_overflow >= 0 else len(batches)
+                max_workers = max(1, min(max_workers, len(batches), pool_capacity))
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    rowcount = sum(executor.map(run_batch, batches))
+            else:
+                rowcount = sum(run_batch(x) for x in batches)
+
+        if self.stats_sink is not None:
+            self._record_query(f'delete from {schema_name}.{table_name} by {pkey_name}',
+                               time.perf_counter() - start,
+                               rows=rowcount,
+                               default_helper='delete_many')
+
+        logger.info(f'Deleted {rowcount} rows from {schema_name}.{table_name}')
+        return rowcount
+
+    def read_table(self,
+                   schema_name: str,
+                   table_name: str,
+                   chunksize: int=None) -> typing.Union['pd.DataFrame', typing.Iterator['pd.DataFrame']]:
+        """
+        Read an entire SQL table or view as a dataframe. If `chunksize` is given, return an
+        iterator of dataframes of at most `chunksize` rows each instead.
+        """
+        sql = self._read_table_sql(schema_name, table_name)
+        if chunksize is not None:
+            return self.read_sql_chunks(sql, chunksize=chunksize, simplify=False)
+
+        df = self.read_sql(sql)
+        logger.info(f"Read dataframe {schema_name}.{table_name}, shape: {df.shape}")
+        return df
+
+    def export_table(self,
+                     schema_name: str,
+                     table_name: str,
+                     fpath: typing.Union[str, pathlib.Path],
+                     format: str='parquet',
+                     batchsize: int=100000,
+                     compression: str=None) -> str:
+        """
+        Export a table to a columnar Apache Parquet or Arrow IPC file, and return the path of
+        the file. Rows are fetched from a server-side cursor and written `batchsize` rows at a
+        time, as one Parquet row group or Arrow record batch each, so only a single batch is
+        held in memory. Requires `pyarrow`.
+
+        Column types are taken from the table definition where an Arrow counterpart exists,
+        i.e. `bigint` as int64 and `numeric(p, s)` as decimal128(p, s). Unconstrained `numeric`
+        and `numeric` of more than 38 digits are exported as strings so that no precision is
+        lost, json as strings, and other types are inferred from the first batch.
+
+        format {str} one of 'parquet' or 'arrow'
+        compression {str} codec, defaults to 'snappy' for Parquet and none for Arrow
+        """
+        assert format in ['parquet', 'arrow'], "`format` must be one of 'parquet', 'arrow'"
+        assert batchsize > 0, '`batchsize` must be a positive integer'
+        pa = _import_optional('pyarrow', 'export_table()', extra='pyarrow')
+
+        fpath = os.path.expanduser(fpath)
+        # Type modifiers are needed to export numeric(p, s) columns as decimals
+        dtypes = {col: metadata['full_data_type'] for col, metadata in self._table_columns(schema_name, table_name).items()}
+        columns = list(dtypes)
+        types = [self._arrow_type(dtypes[col]) for col in columns]
+        converters = [self._arrow_converter(dtypes[col]) for col in columns]
+
+        column_str = ', '.join(['"' + x + '"' for x in columns])
+        sql = f'select {column_str} from "{schema_name}"."{table_name}"'
+
+        writer = None
+        nrows = 0
+        try:
+            for rows in self.read_sql_chunks(sql, chunksize=batchsize, as_tuples=True):
+                arrays = []
+                for values, dtype, convert in zip(zip(*rows), types, converters):
+                    if convert is not None:
+                        values = [None if x is None else convert(x) for x in values]
+
+                    arrays.append(pa.array(values, type=dtype))
+
+                if writer is None:
+                    # Fix the types left to inference by the first batch for all further batches
+                    types = [x.type if dtype is None and not pa.types.is_null(x.type) else dtype or pa.string()
+                             for x, dtype in zip(arrays, types)]
+                    schema = pa.schema(list(zip(columns, types)))
+                    writer = self._arrow_writer(fpath, format, schema, compression)
+                    arrays = [x.cast(dtype) for x, dtype in zip(arrays, types)]
+
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                nrows += len(rows)
+
+            if writer is None:
+                # Empty table, write the schema only
+                types = [dtype or pa.string() for dtype in types]
+                writer = self._arrow_writer(fpath, format, pa.schema(list(zip(columns, types))), compression)
+
+        finally:
+            if writer is not None:
+                writer.close()
+
+        logger.info(f'Exported {nrows} rows of {schema_name}.{table_name} to "{fpath}"')
+        return fpath
+
+    def import_table(self,
+                     fpath: typing.Union[str, pathlib.Path],
+                     schema_name: str,
+                     table_name: str,
+                     format: str=None,
+                     batchsize: int=100000,
+                     bufsize: int=65536) -> int:
+        """
+        Bulk load an Apache Parquet or Arrow IPC file, i.e. written by `export_table()`, into
+        an existing table with `COPY ... FROM STDIN`. The file is read one batch of at most
+        `batchsize` rows at a time and streamed to the database in a single COPY, so memory use
+        is bounded by the batch size. File columns are matched to table columns by name.
+        Requires `pyarrow`. Return the number of rows loaded.
+
+        format {str} one of 'parquet' or 'arrow', inferred from the file extension by default
+        """
+        fpath = os.path.expanduser(fpath)
+        if format is None:
+            format = 'parquet' if os.path.splitext(str(fpath))[1].lower() in ['.parquet', '.pq'] else 'arrow'
+
+        assert format in ['parquet', 'arrow'], "`format` must be one of 'parquet', 'arrow'"
+        assert batchsize > 0, '`batchsize` must be a positive integer'
+
+        if format == 'parquet':
+            pq = _import_optional('pyarrow.parquet', 'import_table()', extra='pyarrow')
+            reader = pq.ParquetFile(fpath)
+            columns = reader.schema_arrow.names
+            batches = reader.iter_batches(batch_size=batchsize)
+        else:
+            pa = _import_optional('pyarrow', 'import_table()', extra='pyarrow')
+            reader = pa.ipc.open_file(fpath)
+            columns = reader.schema.names
+            batches = (batch.slice(offset, batchsize)
+                       for batch in (reader.get_batch(i) for i in range(reader.num_record_batches))
+                       for offset in range(0, batch.num_rows, batchsize))
+
+        # Convert one batch to Python values at a time, as the database consumes the rows. Only
+        # Arrow nulls are loaded as NULL, so that i.e. empty strings round-trip unchanged
+        rows = (row for batch in batches for row in zip(*[x.to_pylist() for x in batch.columns]))
+        return self.copy_from_rows(rows, schema_name, table_name, columns, bufsize=bufsize, null_equivalents=False)
+
+    def _arrow_type(self, dtype: str) -> typing.Any:
+        """
+        Get the Arrow type of a column of SQL datatype `dtype`, including type modifiers, or
+        None if there is no fixed counterpart and the type should be inferred from the data.
+        """
+        pa = _import_optional('pyarrow', 'export_table()', extra='pyarrow')
+
+        precision_scale = self._decimal_precision_scale(dtype)
+        if precision_scale is not None:
+            return pa.decimal128(*precision_scale)
+
+        # Drop type modifiers, i.e. 'timestamp(3) without time zone' or 'character varying(10)'
+        dtype = re.sub(r'\(\d+(,\d+)?\)', '', dtype)
+        if dtype.startswith('character') and not dtype.endswith('[]'):
+            return pa.string()
+
+        return {
+            'smallint': pa.int16(),
+            'integer': pa.int32(),
+            'bigint': pa.int64(),
+            'real': pa.float32(),
+            'double precision': pa.float64(),
+            'numeric': pa.string(),
+            'boolean': pa.bool_(),
+            'text': pa.string(),
+            'uuid': pa.string(),
+            'json': pa.string(),
+            'jsonb': pa.string(),
+            'bytea': pa.binary(),
+            'date': pa.date32(),
+            'time without time zone': pa.time64('us'),
+            'timestamp without time zone': pa.timestamp('us'),
+            'timestamp with time zone': pa.timestamp('us', tz='UTC'),
+        }.get(dtype)
+
+    def _arrow_converter(self, dtype: str) -> typing.Optional[typing.Callable[[typing.Any], typing.Any]]:
+        """
+        Get a function converting a non-null value fetched from a column of SQL datatype
+        `dtype`, including type modifiers, for its Arrow type, or None if no conversion is needed.
+        """
+        if dtype in ['json', 'jsonb']:
+            return lambda val: val if isinstance(val, str) else json.dumps(val)
+        elif dtype == 'bytea':
+            return bytes
+        elif dtype == 'uuid':
+            return str
+        elif dtype.startswith('numeric') and self._decimal_precision_scale(dtype) is None:
+            # Exported as strings, see `_arrow_type()`
+            return str
+
+        return None
+
+    def _decimal_precision_scale(self, dtype: str) -> typing.Optional[tuple]:
+        """
+        Get the precision and scale of a `numeric(p,s)` datatype that fits an Arrow decimal128,
+        or None if `dtype` is any other type.
+        """
+        match = re.match(r'^numeric\((\d+),(\d+)\)$', dtype)
+        if match and int(match.group(1)) <= 38:
+            return int(match.group(1)), int(match.group(2))
+
+        return None
+
+    def _arrow_writer(self, fpath: str, format: str, schema: typing.Any, compression: str=None) -> typing.Any:
+        """
+        Open a Parquet or Arrow IPC file writer, exposing `write_batch()` and `close()`.
+        """
+        pa = _import_optional('pyarrow', 'export_table()', extra='pyarrow')
+
+        if format == 'parquet':
+            pq = _import_optional('pyarrow.parquet', 'export_table()', extra='pyarrow')
+            return pq.ParquetWriter(fpath, schema, compression=compression or 'snappy')
+
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+        return pa.ipc.new_file(fpath, schema, options=options)
+
+    def dump(self,
+             backup_dir: typing.Union[str, pathlib.Path],
+             format: str='plain',
+             jobs: int=1,
+             compress: int=None,
+             schemas: typing.Union[str, list]=None,
+             exclude_schemas: typing.Union[str, list]=None,
+             tables: typing.Union[str, list]=None,
+             exclude_tables: typing.Union[str, list]=None,
+             progress: bool=False,
+             callback: typing.Callable[[str], typing.Any]=None) -> str:
+        """
+        Wrap `pg_dump` and save an entire database contents to a directory. Return the path
+        of the dump file, or of the dump directory if `format` is 'directory'.
+
+        Parameter `format` must be one of 'plain' (a `.sql` script), 'custom' (a `.dump`
+        archive), 'directory' or 'tar' (a `.tar` archive). Only the directory format may be
+        dumped by several parallel `jobs`. Optionally set the `compress` level from 0 to 9,
+        in which case a compressed plain-format script is written to `.sql.gz`.
+
+        Restrict the dump with lists of `schemas` or `tables` to include, and of
+        `exclude_schemas` or `exclude_tables` to leave out, each given as `pg_dump` patterns,
+        i.e. 'my_schema.my_table' or 'my_schema.*'.
+
+        `pg_dump` runs in verbose mode, and each line of its log is passed to `callback` as it
+        is written. Set `progress` to display a progress bar counting dumped tables.
+        """
+        backup_dir = os.path.expanduser(backup_dir)
+        logger.info(f'Dumping database {self.db_name} to "{backup_dir}"')
+
+        bin = find_binary('pg_dump', abort=True)
+        cmd, output_fpath = self._dump_cmd(bin,
+                                           backup_dir,
+                                           format=format,
+                                           jobs=jobs,
+                                           compress=compress,
+                                           schemas=schemas,
+                                           exclude_schemas=exclude_schemas,
+                                           tables=tables,
+                                           exclude_tables=exclude_tables)
+
+        # Dump data goes to `--file`, so only the verbose log is streamed
+        pbar = tqdm.tqdm(unit='table') if progress else None
+
+        def on_line(line):
+            if callback is not None:
+                callback(line)
+
+            if progress and 'dumping contents of table' in line:
+                pbar.set_postfix_str(line.split('dumping contents of table')[-1].strip(' "'))
+                pbar.update(1)
+
+        try:
+            returncode, tail = run_cmd(cmd, callback=on_line, tail_lines=20)
+        finally:
+            if progress:
+                pbar.close()
+
+        if returncode != 0:
+            raise Exception(f'pg_dump exited with status {returncode}: ' + '\n'.join(tail).strip())
+
+        return output_fpath
+
+    def _dump_cmd(self,
+                  bin: str,
+                  backup_dir: str,
+                  format: str='plain',
+                  jobs: int=1,
+                  compress: int=None,
+                  schemas: typing.Union[str, list]=None,
+                  exclude_schemas: typing.Union[str, list]=None,
+                  tables: typing.Union[str, list]=None,
+                  exclude_tables: typing.Union[str, list]=None) -> tuple:
+        """
+        Build the `pg_dump` argument list of `dump()`, and the path of the dump it writes.
+        """
+        formats = dict(plain='.sql', custom='.dump', directory='', tar='.tar')
+        assert format in formats, f'`format` must be one of {list(formats)}'
+        assert jobs >= 1, '`jobs` must be a positive integer'
+        assert jobs == 1 or format == 'directory', "Parallel `jobs` require `format='directory'`"
+        assert compress is None or 0 <= compress <= 9, '`compress` must be between 0 and 9'
+
+        output_fpath = f'{backup_dir}/{self.db_name}{formats[format]}'
+        if format == 'plain' and compress:
+            # pg_dump gzips plain-format output as a whole when compressed
+            output_fpath += '.gz'
+
+        cmd = [bin, '--username', self.pg_user, '--format', format, '--file', output_fpath, '--verbose']
+        if jobs > 1:
+            cmd += ['--jobs', str(jobs)]
+
+        if compress is not None:
+            cmd += ['--compress', str(compress)]
+
+        for option, patterns in [('--schema', schemas),
+                                 ('--exclude-schema', exclude_schemas),
+                                 ('--table', tables),
+                                 ('--exclude-table', exclude_tables)]:
+            for pattern in ensurelist(patterns) if patterns is not None else []:
+                cmd += [option, pattern]
+
+        cmd.append(self.db_name)
+        return cmd, output_fpath
+
+    def dump_tables(self,
+                    backup_dir: typing.Union[str, pathlib.Path],
+                    sep: str=',',
+                    coerce_csv: bool=False,
+                    method: str='server',
+                    max_workers: int=4,
+                    format: str='csv') -> list:
+        """
+        Dump each table in database to a textfile with specified separator.
+
+        Parameter `method` must be one of:
+
+            - 'server': the database server writes each table to `backup_dir` with a
+              server-side `COPY ... TO '<path>'`, one table after another. Requires superuser
+              rights, and `backup_dir` must be on the database server's filesystem.
+            - 'client': tables are streamed with `COPY ... TO STDOUT` over up to `max_workers`
+              pooled connections in parallel, and written straight to `<schema>.<table>.csv`
+              files in the local `backup_dir`. All tables are read from the same snapshot,
+              held open on one more connection, so tables are copied one after another if the
+              pool cannot spare at least two further connections.
+
+        If `coerce_csv` is True, files are written comma-separated with quoted text values.
+
+        Set `format` to 'parquet' or 'arrow' to instead export each table with `export_table()`
+        to a `<schema>.<table>.parquet` or `.arrow` file in the local `backup_dir`, over up to
+        `max_workers` connections in parallel. Tables are not read from a common snapshot.
+
+        Source: https://stackoverflow.com/questions/17463299/export-database-into-csv-file?answertab=oldest#tab-top
+        """
+        assert method in ['server', 'client'], "`method` must be one of 'server', 'client'"
+        assert format in ['csv', 'parquet', 'arrow'], "`format` must be one of 'csv', 'parquet', 'arrow'"
+        if format != 'csv':
+            _import_optional('pyarrow', f"dump_tables(format='{format}')", extra='pyarrow')
+            return self._dump_tables_columnar(backup_dir, format=format, max_workers=max_workers)
+
+        if method == 'client':
+            return self._dump_tables_client(backup_dir, sep=sep, coerce_csv=coerce_csv, max_workers=max_workers)
+
+        db_to_csv = """
+        CREATE OR REPLACE FUNCTION db_to_csv(path TEXT) RETURNS void AS $$
+        DECLARE
+           tables RECORD;
+           statement TEXT;
+        BEGIN
+        FOR tables IN
+           SELECT ('"' || table_schema || '"' || '.' || '"' || table_name || '"') AS schema_table
+           FROM information_schema.tables t
+               INNER JOIN information_schema.schemata s ON s.schema_name = t.table_schema
+           WHERE t.table_schema NOT IN ('pg_catalog', 'information_schema')
+               AND t.table_type NOT IN ('VIEW')
+           ORDER BY schema_table
+        LOOP
+           statement := 'COPY ' || tables.schema_table || ' TO ''' || path || '/' || replace(tables.schema_table, '"', '') || '.csv' ||''' DELIMITER ''{sep}'' CSV HEADER';
+           EXECUTE statement;
+        END LOOP;
+        RETURN;
+        END;
+        $$ LANGUAGE plpgsql;""".format(**locals())
+        self.execute(db_to_csv)
+
+        # Execute function, dumping each table to a textfile.
+        # Function is used as follows: SELECT db_to_csv('/path/to/dump/destination');
+        logger.info(f'Dumping database {self.db_name} to "{backup_dir}" as tables stored as textfiles')
+        self.execute(f"select db_to_csv('{backup_dir}')")
+
+        # If coerce_csv is True, read in each file outputted, then write as a quoted CSV.
         # Replace 'sep' if different from ',' and quote each text field.
         if coerce_csv:
             if sep != ',':
@@ -570,20 +2073,142 @@ class Postgres(object):
 
         return dumped_files
 
+    def _dump_tables_client(self,
+                            backup_dir: typing.Union[str, pathlib.Path],
+                            sep: str=',',
+                            coerce_csv: bool=False,
+                            max_workers: int=4) -> list:
+        """
+        Dump each table in database to a local textfile by streaming `COPY ... TO STDOUT` over
+        several pooled connections in parallel. See `dump_tables()`.
+        """
+        backup_dir = os.path.expanduser(backup_dir)
+        tables = self._user_tables()
+        logger.info(f'Dumping {len(tables)} tables of database {self.db_name} to "{backup_dir}"')
+
+        if not len(tables):
+            return []
+
+        if coerce_csv:
+            sep = ','
+
+        pool_capacity = self.pool_size + self.max_overflow if self.max_overflow >= 0 else len(tables) + 1
+        # One connection holds the exported snapshot for the duration of the dump, so workers
+        # may check out at most the rest of the pool
+        max_workers = min(max_workers, len(tables), pool_capacity - 1)
+
+        # Column metadata is read with the same cursor as the data, inside the snapshot, so that
+        # it matches the dumped rows even if tables are altered during the dump
+        columns_sql = str(sqlalchemy.text(TABLE_COLUMNS_SQL).compile(dialect=self.dbcon.dialect))
+
+        def copy_table(cursor, schema_name, table_name):
+            options = ['format csv', 'header', "delimiter '" + sep.replace("'", "''") + "'"]
+            if coerce_csv:
+                # Quote all but numeric and boolean values, as `csv.QUOTE_NONNUMERIC` would
+                unquoted = ('smallint', 'integer', 'bigint', 'numeric', 'real', 'double precision', 'boolean')
+                cursor.execute(columns_sql, dict(schema_name=schema_name, table_name=table_name))
+                quoted = [row[0] for row in cursor.fetchall() if not row[1].startswith(unquoted)]
+                if len(quoted):
+                    options.append('force_quote (' + ', '.join(['"' + x + '"' for x in quoted]) + ')')
+
+            sql = f'copy "{schema_name}"."{table_name}" to stdout with ({", ".join(options)})'
+            fpath = os.path.join(backup_dir, f'{schema_name}.{table_name}.csv')
+            with open(fpath, 'w', encoding='utf-8', newline='') as f:
+                cursor.copy_expert(sql, f)
+
+            return fpath
+
+        def copy_table_in_snapshot(schema_name, table_name):
+            raw_con = self.dbcon.raw_connection()
+            try:
+                cursor = raw_con.cursor()
+                cursor.execute('set transaction isolation level repeatable read, read only')
+                cursor.execute(f"set transaction snapshot '{snapshot}'")
+                fpath = copy_table(cursor, schema_name, table_name)
+                raw_con.rollback()
+            finally:
+                raw_con.close()
+
+            return fpath
+
+        # Export a snapshot so that every worker reads a consistent view of the database
+        snapshot_con = self.dbcon.raw_connection()
+        try:
+            cursor = snapshot_con.cursor()
+            cursor.execute('set transaction isolation level repeatable read, read only')
+            cursor.execute('select pg_export_snapshot()')
+            snapshot = cursor.fetchone()[0]
+
+            if max_workers < 2:
+                # Too few connections to spare for workers, copy on the snapshot connection itself
+                dumped_files = [copy_table(cursor, *x) for x in tables]
+            else:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    dumped_files = list(executor.map(lambda x: copy_table_in_snapshot(*x), tables))
+
+            snapshot_con.rollback()
+        finally:
+            snapshot_con.close()
+
+        return dumped_files
+
+    def _dump_tables_columnar(self,
+                              backup_dir: typing.Union[str, pathlib.Path],
+                              format: str='parquet',
+                              max_workers: int=4) -> list:
+        """
+        Export each table in database to a local Parquet or Arrow IPC file with
+        `export_table()`, several tables at a time. See `dump_tables()`.
+        """
+        backup_dir = os.path.expanduser(backup_dir)
+        tables = self._user_tables()
+        logger.info(f'Exporting {len(tables)} tables of database {self.db_name} to "{backup_dir}" as {format}')
+
+        if not len(tables):
+            return []
+
+        pool_capacity = self.pool_size + self.max_overflow if self.max_overflow >= 0 else len(tables)
+        max_workers = max(1, min(max_workers, len(tables), pool_capacity))
+
+        def export(schema_name, table_name):
+            fpath = os.path.join(backup_dir, f'{schema_name}.{table_name}.{format}')
+            return self.export_table(schema_name, table_name, fpath, format=format)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda x: export(*x), tables))
+
+    def _user_tables(self) -> list:
+        """
+        Get a sorted list of (schema, table) tuples of all tables outside the system schemas.
+        Partitioned tables hold no rows of their own and cannot be copied from, so only their
+        partitions, which are tables themselves, are listed.
+        """
+        sql = """
+        select n.nspname as table_schema, c.relname as "table_name"
+        from pg_catalog.pg_class c
+        join pg_catalog.pg_namespace n
+          on n.oid = c.relnamespace
+        where c.relkind = 'r'
+          and c.relpersistence <> 't'
+          and n.nspname not in ('pg_catalog', 'information_schema')
+        """
+        tables = self.read_sql(sql, simplify=False)
+        return sorted(zip(tables['table_schema'], tables['table_name']))
+
     def create_schema(self, schema_name: str) -> None:
         """
         Create a Postgres schema.
         """
-        self.execute(f'create schema {schema_name}')
+        self.execute(self._create_schema_sql(schema_name))
+        self.invalidate_metadata(schema_name)
 
     def drop_schema(self, schema_name: str, if_exists: bool=False, cascade: bool=False) -> None:
         """
         Drop a Postgres schema with options to only drop if it currently exists, and
         to drop dependent objects on it with `cascade`.
         """
-        cascade_str = ' cascade' if cascade else ''
-        if_exists_str = 'if exists ' if if_exists else ''
-        self.execute(f'drop schema {if_exists_str}{schema_name}{cascade_str}')
+        self.execute(self._drop_schema_sql(schema_name, if_exists=if_exists, cascade=cascade))
+        self._invalidate_dropped(schema_name, cascade=cascade)
 
     def drop_schema_and_recreate(self, schema_name: str, if_exists: bool=False, cascade: bool=False) -> None:
         """
@@ -593,25 +2218,20 @@ class Postgres(object):
         self.drop_schema(**args)
         self.create_schema(schema_name)
 
-    def list_tables(self, schema_name: str=None) -> pd.DataFrame:
+    def list_tables(self, schema_name: str=None) -> 'pd.DataFrame':
         """
-        Query information schema for a list of tables present in the database connection.
+        Query the system catalog for a list of tables present in the database connection.
         """
-        additional_cond = f"and table_schema = '{schema_name}'" if isinstance(schema_name, str) else ''
-        sql = f"""
-        select table_schema, "table_name"
-        from information_schema.tables
-        where table_type = 'BASE TABLE'
-          {additional_cond}
-        """
-        return self.read_sql(sql)
+        sql, params = self._list_tables_sql(schema_name)
+        return self.read_sql(sql, params=params)
 
     def table_exists(self, schema_name: str=None, table_name: str=None) -> bool:
         """
-        Return a boolean indicating whether a table is existent in the database connection
+        Return a boolean indicating whether a table is existent in the database connection,
+        in any schema if `schema_name` is None.
         """
-        tables = self.list_tables(schema_name)
-        return table_name in tables['table_name'].tolist()
+        sql, params = self._relation_exists_sql(schema_name, table_name, RELKINDS['table'])
+        return bool(self.read_sql(sql, params=params).iloc[0])
 
     def create_table(self, schema_name: str, table_name: str, columnspec: dict, if_not_exists: bool=False):
         """
@@ -624,96 +2244,280 @@ class Postgres(object):
                 ...
             }
         """
-        tab_ws = '    '
+        self.execute(self._create_table_sql(schema_name, table_name, columnspec, if_not_exists=if_not_exists))
+        self.invalidate_metadata(schema_name, table_name)
 
-        columnspec_lst = []
-        for col, dtype in columnspec.items():
-            line_item = col + ' ' + dtype + ',\n'
-            columnspec_lst.append(line_item)
+    def wipe_table(self,
+                   schema_name: str,
+                   table_name: str,
+                   truncate: bool=False,
+                   restart_identity: bool=False,
+                   cascade: bool=False) -> None:
+        """
+        Delete all records in a table but do not drop the table. Nothing is done if the table
+        does not exist.
 
-        columnspec_str = tab_ws + tab_ws.join(columnspec_lst).rstrip('\n,')
+        By default, records are deleted row by row with `DELETE`. Set `truncate` to empty the
+        table with `TRUNCATE` instead, which is much faster for large tables but takes an
+        exclusive lock. See `truncate_tables()` for `restart_identity` and `cascade`.
+        """
+        if not len(self._existing_relations([(schema_name, table_name)])):
+            return
 
-        if_not_exists_str = 'if not exists ' if if_not_exists else ''
-        create_table_sql_lst = [
-            f'create table {if_not_exists_str}{schema_name}.{table_name} (',
-            columnspec_str,
-            ')',
-        ]
+        if truncate:
+            self.execute(self._truncate_sql([(schema_name, table_name)], restart_identity=restart_identity, cascade=cascade))
+        else:
+            self.execute(self._wipe_table_sql(schema_name, table_name))
+
+    def truncate_tables(self,
+                        tables: typing.Iterable[typing.Union[str, tuple]],
+                        restart_identity: bool=False,
+                        cascade: bool=False) -> list:
+        """
+        Empty many tables with a single `TRUNCATE` statement, skipping tables that do not
+        exist. Return the list of (schema, table) tuples truncated.
 
-        create_table_sql = '\n'.join(create_table_sql_lst)
-        self.execute(create_table_sql)
+        tables {list} (schema, table) tuples or 'schema.table' strings
+        restart_identity {bool} reset sequences owned by columns of the truncated tables
+        cascade {bool} also truncate tables with foreign keys referencing the truncated tables
+        """
+        tables = self._parse_relation_names(tables)
+        existing = self._existing_relations(tables)
+        tables = [x for x in tables if x in existing]
+
+        if len(tables):
+            self.execute(self._truncate_sql(tables, restart_identity=restart_identity, cascade=cascade))
+
+        return tables
 
-    def wipe_table(self, schema_name: str, table_name: str) -> None:
+    def _parse_relation_names(self, names: typing.Iterable[typing.Union[str, tuple]]) -> list:
         """
-        Delete all records in a table but do not drop the table.
+        Convert (schema, name) tuples or 'schema.name' strings to a list of (schema, name) tuples.
         """
-        if self.table_exists(schema_name, table_name):
-            self.execute(f'delete from {schema_name}.{table_name} where 1 = 1')
+        # Any iterable of names, i.e. a generator, set or tuple of 'schema.name' strings
+        names = [names] if isinstance(names, str) else list(names)
+        relations = [x if isinstance(x, tuple) else tuple(x.split('.', 1)) for x in names]
+        invalid = [x for x in relations if len(x) != 2]
+        assert not len(invalid), f'Relation names must be qualified with a schema: {invalid}'
+        return relations
+
+    def _existing_relations(self, names: list, relkinds: list=RELKINDS['table']) -> set:
+        """
+        Get the subset of (schema, name) tuples that exist as relations of the given kinds,
+        with a single catalog query.
+        """
+        if not len(names):
+            return set()
+
+        sql, params = self._existing_relations_sql(names, relkinds)
+        df = self.read_sql(sql, simplify=False, params=params)
+        return set(zip(df['schema_name'], df['relation_name']))
 
     def drop_table(self, schema_name: str, table_name: str, if_exists: bool=False, cascade: bool=False) -> None:
         """
         Drop a Postgres table.
         """
-        if_exists_str = 'if exists ' if if_exists else ''
-        cascade_str = ' cascade' if cascade else ''
-        sql = f'drop table {if_exists_str}"{schema_name}"."{table_name}"{cascade_str}'
-        self.execute(sql)
+        self.execute(self._drop_relation_sql('table', schema_name, table_name, if_exists=if_exists, cascade=cascade))
+        self._invalidate_dropped(schema_name, table_name, cascade=cascade)
 
-    def list_views(self, schema_name: str=None) -> pd.DataFrame:
+    def list_views(self, schema_name: str=None) -> 'pd.DataFrame':
         """
-        Query information schema for a list of views present in the database connection.
+        Query the system catalog for a list of views present in the database connection.
         """
-        where_clause = f"where table_schema = '{schema_name}'" if isinstance(schema_name, str) else ''
-        sql = f"""
-        select table_schema as view_schema, "table_name" as view_name
-        from information_schema.views
-        {where_clause}
-        order by table_schema, view_name
-        """
-        return self.read_sql(sql)
+        sql, params = self._list_views_sql(schema_name)
+        return self.read_sql(sql, params=params)
 
     def view_exists(self, schema_name: str=None, view_name: str=None) -> bool:
         """
-        Return a boolean indicating whether a view is existent in the database connection
+        Return a boolean indicating whether a view is existent in the database connection,
+        in any schema if `schema_name` is None.
         """
-        views = self.list_views(schema_name)
-        return view_name in views['view_name'].tolist()
+        sql, params = self._relation_exists_sql(schema_name, view_name, RELKINDS['view'])
+        return bool(self.read_sql(sql, params=params).iloc[0])
 
     def table_or_view_exists(self, schema_name: str=None, table_or_view_name: str=None) -> bool:
         """
         Determine whether a table or view exists in the database connection.
         """
-        return self.table_exists(schema_name, table_or_view_name) or self.view_exists(schema_name, table_or_view_name)
+        sql, params = self._relation_exists_sql(schema_name, table_or_view_name, RELKINDS['table_or_view'])
+        return bool(self.read_sql(sql, params=params).iloc[0])
+
+    def exists_many(self, names: typing.Iterable[typing.Union[str, tuple]], kind: str='table') -> dict:
+        """
+        Determine which of many relations exist, with a single catalog query. Return a
+        dictionary mapping each of `names` to a boolean.
+
+        names {list} (schema, name) tuples or 'schema.name' strings
+        kind {str} one of 'table', 'view' or 'table_or_view'
+        """
+        assert kind in RELKINDS, f'`kind` must be one of {list(RELKINDS)}'
+        names = [names] if isinstance(names, str) else list(names)
+        relations = self._parse_relation_names(names)
+        existing = self._existing_relations(relations, relkinds=RELKINDS[kind])
+        return {name: relation in existing for name, relation in zip(names, relations)}
 
     def create_view(self, schema_name: str, view_name: str, view_sql: str, or_replace: bool=False):
         """
         Create a view from user-passed SQL.
         """
-        or_replace_str = 'or replace ' if or_replace else ''
-        sql = f'create {or_replace_str}view "{schema_name}"."{view_name}" as ({view_sql})'
-        self.execute(sql)
+        self.execute(self._create_view_sql(schema_name, view_name, view_sql, or_replace=or_replace))
+        self.invalidate_metadata(schema_name, view_name)
 
     def drop_view(self, schema_name: str, view_name: str, if_exists: bool=False, cascade: bool=False) -> None:
         """
         Drop a Postgres view.
         """
-        if_exists_str = 'if exists ' if if_exists else ''
-        cascade_str = ' cascade' if cascade else ''
-        sql = f'drop view {if_exists_str}"{schema_name}"."{view_name}"{cascade_str}'
-        self.execute(sql)
+        self.execute(self._drop_relation_sql('view', schema_name, view_name, if_exists=if_exists, cascade=cascade))
+        self._invalidate_dropped(schema_name, view_name, cascade=cascade)
 
     def trigger_exists(self, trigger_schema: str=None, trigger_name: str=None) -> bool:
         """
-        Return a boolean indicating whether a trigger is existent in the database connection
+        Return a boolean indicating whether a trigger is existent in the database connection,
+        in any schema if `trigger_schema` is None.
         """
-        triggers = self.list_triggers(trigger_schema)
-        return trigger_name in triggers['trigger_name'].tolist()
+        sql, params = self._trigger_exists_sql(trigger_schema, trigger_name)
+        return bool(self.read_sql(sql, params=params).iloc[0])
 
     def list_triggers(self, trigger_schema: str=None) -> list:
         """
         Query information schema for a list of triggers present in the database connection.
         """
-        where_clause = f"where trigger_schema = '{trigger_schema}'" if isinstance(trigger_schema, str) else ''
+        sql, params = self._list_triggers_sql(trigger_schema)
+        return self.read_sql(sql, params=params)
+
+    #
+    # SQL builders shared by `Postgres` and `AsyncPostgres`
+    #
+
+    def _read_table_sql(self, schema_name: str, table_name: str) -> str:
+        return f'select * from "{schema_name}"."{table_name}"'
+
+    def _create_schema_sql(self, schema_name: str) -> str:
+        return f'create schema {schema_name}'
+
+    def _drop_schema_sql(self, schema_name: str, if_exists: bool=False, cascade: bool=False) -> str:
+        cascade_str = ' cascade' if cascade else ''
+        if_exists_str = 'if exists ' if if_exists else ''
+        return f'drop schema {if_exists_str}{schema_name}{cascade_str}'
+
+    def _create_table_sql(self, schema_name: str, table_name: str, columnspec: dict, if_not_exists: bool=False) -> str:
+        tab_ws = '    '
+
+        columnspec_lst = []
+        for col, dtype in columnspec.items():
+            line_item = col + ' ' + dtype + ',\n'
+            columnspec_lst.append(line_item)
+
+        columnspec_str = tab_ws + tab_ws.join(columnspec_lst).rstrip('\n,')
+
+        if_not_exists_str = 'if not exists ' if if_not_exists else ''
+        create_table_sql_lst = [
+            f'create table {if_not_exists_str}{schema_name}.{table_name} (',
+            columnspec_str,
+            ')',
+        ]
+
+        return '\n'.join(create_table_sql_lst)
+
+    def _wipe_table_sql(self, schema_name: str, table_name: str) -> str:
+        return f'delete from {schema_name}.{table_name} where 1 = 1'
+
+    def _truncate_sql(self, tables: list, restart_identity: bool=False, cascade: bool=False) -> str:
+        table_str = ', '.join([f'"{schema_name}"."{table_name}"' for schema_name, table_name in tables])
+        restart_identity_str = ' restart identity' if restart_identity else ''
+        cascade_str = ' cascade' if cascade else ''
+        return f'truncate table {table_str}{restart_identity_str}{cascade_str}'
+
+    def _relation_exists_sql(self, schema_name: str, name: str, relkinds: list) -> tuple:
+        sql = """
+        select exists (
+            select 1
+            from pg_catalog.pg_class c
+            join pg_catalog.pg_namespace n
+              on n.oid = c.relnamespace
+            where c.relname = :name
+              and (cast(:schema_name as text) is null or n.nspname = :schema_name)
+              and cast(c.relkind as text) = any(cast(:relkinds as text[]))
+              and (c.relkind = 'v' or c.relpersistence <> 't')
+        ) as relation_exists
+        """
+        return sql, dict(schema_name=schema_name, name=name, relkinds=list(relkinds))
+
+    def _trigger_exists_sql(self, trigger_schema: str, trigger_name: str) -> tuple:
+        sql = """
+        select exists (
+            select 1
+            from pg_catalog.pg_trigger t
+            join pg_catalog.pg_class c
+              on c.oid = t.tgrelid
+            join pg_catalog.pg_namespace n
+              on n.oid = c.relnamespace
+            where t.tgname = :trigger_name
+              and not t.tgisinternal
+              and (cast(:trigger_schema as text) is null or n.nspname = :trigger_schema)
+        ) as trigger_exists
+        """
+        return sql, dict(trigger_schema=trigger_schema, trigger_name=trigger_name)
+
+    def _existing_relations_sql(self, names: list, relkinds: list=RELKINDS['table']) -> tuple:
+        sql = """
+        select n.nspname as schema_name, c.relname as relation_name
+        from unnest(cast(:schema_names as text[]), cast(:relation_names as text[])) as x(schema_name, relation_name)
+        join pg_catalog.pg_namespace n
+          on n.nspname = x.schema_name
+        join pg_catalog.pg_class c
+          on c.relnamespace = n.oid
+         and c.relname = x.relation_name
+        where cast(c.relkind as text) = any(cast(:relkinds as text[]))
+          and (c.relkind = 'v' or c.relpersistence <> 't')
+        """
+        params = dict(schema_names=[x[0] for x in names],
+                      relation_names=[x[1] for x in names],
+                      relkinds=list(relkinds))
+        return sql, params
+
+    def _create_view_sql(self, schema_name: str, view_name: str, view_sql: str, or_replace: bool=False) -> str:
+        or_replace_str = 'or replace ' if or_replace else ''
+        return f'create {or_replace_str}view "{schema_name}"."{view_name}" as ({view_sql})'
+
+    def _drop_relation_sql(self,
+                           relation_type: str,
+                           schema_name: str,
+                           name: str,
+                           if_exists: bool=False,
+                           cascade: bool=False) -> str:
+        if_exists_str = 'if exists ' if if_exists else ''
+        cascade_str = ' cascade' if cascade else ''
+        return f'drop {relation_type} {if_exists_str}"{schema_name}"."{name}"{cascade_str}'
+
+    def _list_tables_sql(self, schema_name: str=None) -> tuple:
+        additional_cond = 'and n.nspname = :schema_name' if isinstance(schema_name, str) else ''
+        sql = f"""
+        select n.nspname as table_schema, c.relname as "table_name"
+        from pg_catalog.pg_class c
+        join pg_catalog.pg_namespace n
+          on n.oid = c.relnamespace
+        where c.relkind in ('r', 'p')
+          and c.relpersistence <> 't'
+          {additional_cond}
+        """
+        return sql, dict(schema_name=schema_name) if additional_cond else None
+
+    def _list_views_sql(self, schema_name: str=None) -> tuple:
+        additional_cond = 'and n.nspname = :schema_name' if isinstance(schema_name, str) else ''
+        sql = f"""
+        select n.nspname as view_schema, c.relname as view_name
+        from pg_catalog.pg_class c
+        join pg_catalog.pg_namespace n
+          on n.oid = c.relnamespace
+        where c.relkind = 'v'
+          {additional_cond}
+        order by view_schema, view_name
+        """
+        return sql, dict(schema_name=schema_name) if additional_cond else None
+
+    def _list_triggers_sql(self, trigger_schema: str=None) -> tuple:
+        where_clause = 'where trigger_schema = :trigger_schema' if isinstance(trigger_schema, str) else ''
         sql = f"""
         select event_object_schema as table_schema
                , event_object_table as "table_name"
@@ -728,7 +2532,166 @@ class Postgres(object):
         group by 1, 2, 3, 4, 6, 7, 8
         order by table_schema, "table_name"
         """
-        return self.read_sql(sql)
+        return sql, dict(trigger_schema=trigger_schema) if where_clause else None
+
+    def _invalidate_dropped(self, schema_name: str, name: str=None, cascade: bool=False) -> None:
+        """
+        Invalidate cached metadata after dropping a schema, or a relation in it.
+        """
+        # Cascading drops may remove dependent objects in other schemas
+        if cascade:
+            self.invalidate_metadata()
+        else:
+            self.invalidate_metadata(schema_name, name)
+
+    def _copy_rows(self,
+                   cursor: typing.Any,
+                   schema_name: str,
+                   table_name: str,
+                   columns: list,
+                   rows: typing.Iterable[typing.Sequence],
+                   bufsize: int=65536,
+                   into: str=None,
+                   null_equivalents: bool=True) -> int:
+        """
+        Stream rows into a table as CSV over an open DBAPI cursor. Transaction handling is
+        left to the caller. Values are converted for the columns of `schema_name.table_name`,
+        but may be loaded into another relation with the same columns, i.e. a staging table,
+        by passing its quoted name as `into`. If not `null_equivalents`, only None is NULL.
+        """
+        dtypes = self.col_dtypes(schema_name, table_name)
+        missing = [col for col in columns if col not in dtypes]
+        assert not len(missing), f'Nonexistent column(s) {missing} in {schema_name}.{table_name}'
+
+        converters = [self._copy_converter(dtypes[col]) for col in columns]
+        is_null = self._is_null if null_equivalents else (lambda val: val is None)
+
+        def render_line(row):
+            fields = []
+            for convert, val in zip(converters, row):
+                if is_null(val):
+                    # Unquoted empty string is NULL in CSV format
+                    fields.append('')
+                else:
+                    fields.append('"' + convert(val).replace('"', '""') + '"')
+
+            return ','.join(fields) + '\n'
+
+        into = f'"{schema_name}"."{table_name}"' if into is None else into
+        column_str = ', '.join(['"' + x + '"' for x in columns])
+        sql = f'copy {into} ({column_str}) from stdin with (format csv)'
+        cursor.copy_expert(sql, StringIteratorIO(render_line(row) for row in rows), size=bufsize)
+        return cursor.rowcount
+
+    def _stage_rows(self,
+                    cursor: typing.Any,
+                    schema_name: str,
+                    table_name: str,
+                    columns: list,
+                    rows: typing.Iterable[typing.Sequence],
+                    stage_name: str,
+                    chunksize: int=100000,
+                    bufsize: int=65536) -> int:
+        """
+        Create a temporary table `stage_name` with the given columns of a table, dropped at the
+        end of the transaction, and load rows into it over an open DBAPI cursor, `chunksize`
+        rows per COPY. Return the number of rows staged.
+        """
+        column_str = ', '.join(['"' + x + '"' for x in columns])
+        cursor.execute(f'create temp table "{stage_name}" on commit drop as '
+                       f'select {column_str} from "{schema_name}"."{table_name}" limit 0')
+
+        rows = iter(rows)
+        staged = 0
+        for first in rows:
+            chunk = itertools.chain([first], itertools.islice(rows, chunksize - 1))
+            staged += self._copy_rows(cursor, schema_name, table_name, columns, chunk,
+                                      bufsize=bufsize, into=f'"{stage_name}"')
+
+        # Give the planner row estimates for the staged rows
+        cursor.execute(f'analyze "{stage_name}"')
+        return staged
+
+    def _copy_converter(self, dtype: str) -> typing.Callable[[typing.Any], str]:
+        """
+        Get a function rendering a non-null Python value as COPY text for a column of SQL
+        datatype `dtype`.
+        """
+        if dtype.endswith('[]'):
+            convert_element = self._copy_converter(dtype[:-2])
+
+            # Render (nested) lists as array literals with every element quoted
+            def convert(val):
+                if not isinstance(val, (list, tuple)):
+                    return str(val)
+
+                elements = []
+                for x in val:
+                    if x is None:
+                        elements.append('NULL')
+                    elif isinstance(x, (list, tuple)):
+                        elements.append(convert(x))
+                    else:
+                        elements.append('"' + convert_element(x).replace('\\', '\\\\').replace('"', '\\"') + '"')
+
+                return '{' + ','.join(elements) + '}'
+
+        elif dtype in ['smallint', 'integer', 'bigint']:
+            # Integer columns holding nulls are upcast to float by pandas
+            def convert(val):
+                if isinstance(val, float) and val.is_integer():
+                    return str(int(val))
+                return str(val)
+
+        elif dtype == 'boolean':
+            def convert(val):
+                if isinstance(val, bool):
+                    return 't' if val else 'f'
+                return str(val)
+
+        elif dtype in ['json', 'jsonb']:
+            def convert(val):
+                if isinstance(val, (dict, list)):
+                    return json.dumps(val)
+                return str(val)
+
+        elif dtype == 'bytea':
+            def convert(val):
+                if isinstance(val, (bytes, bytearray, memoryview)):
+                    return '\\x' + bytes(val).hex()
+                return str(val)
+
+        else:
+            convert = str
+
+        return convert
+
+    def _is_null(self, val: typing.Any) -> bool:
+        """
+        Determine whether a value should be written as NULL.
+        """
+        if val is None:
+            return True
+        elif 'pandas' in sys.modules and (val is pd.NaT or val is pd.NA):
+            return True
+        elif isinstance(val, float) and val != val:
+            return True
+        else:
+            return str(val).lower() in self.null_equivalents
+
+    def _render_value(self, val: typing.Any, null: str='null') -> typing.Any:
+        """
+        Render a Python value as a SQL literal for use in a statement builder. Null equivalents
+        become `null`, booleans and numerics are left unquoted and all other values are
+        treated as strings and quoted.
+        """
+        if self._is_null(val):
+            return null
+        elif assert_value_dtype(val, 'bool') or assert_value_dtype(val, 'int') or assert_value_dtype(val, 'float'):
+            return val
+        else:
+            # Assume string, handle quotes
+            return self._single_quote(val)
 
     def _single_quote(self, val: typing.Any):
         """
@@ -739,3 +2702,422 @@ class Postgres(object):
             val = "'" + val + "'"
 
         return val
+
+
+class AsyncPostgres(Postgres):
+    """
+    asyncio counterpart of `Postgres`, over an `asyncpg` connection pool, installed with the
+    `async` extra (`pip install sql_query_tools[async]`). Accepts the same
+    arguments as `Postgres`, and offers `execute()`, `read_sql()`, `read_table()`, the DDL
+    helpers and the metadata lookups as coroutines, i.e.
+
+        pg = AsyncPostgres(...)
+        await pg.create_table('my_schema', 'my_table', {'id': 'int'})
+        df = await pg.read_table('my_schema', 'my_table')
+
+    Statement builders are inherited from `Postgres` and are not coroutines, so rendered SQL
+    is identical between both clients. Builders called with `validate=True` read column
+    metadata from the cache only, so `prefetch_metadata()` must be awaited first.
+
+    At most `max_concurrency` queries of this instance run at once, others wait for a slot.
+    Queries exceeding `timeout` seconds (per call, or the instance default) are cancelled.
+    A cancelled coroutine rolls back its transaction, and the connection returns to the pool.
+
+    The engine is bound to the event loop it is first used on and is not shared with other
+    instances. Call `aclose()`, or use the instance as an async context manager, to dispose
+    of it. COPY and dump helpers are not available asynchronously.
+    """
+    def __init__(self, *args, max_concurrency: int=10, timeout: float=None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        assert max_concurrency > 0, '`max_concurrency` must be a positive integer'
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+        # Created on first use, as asyncio primitives may bind to the running event loop
+        self._semaphore = None
+
+    async def __aenter__(self) -> 'AsyncPostgres':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def connect(self) -> 'sqlalchemy.ext.asyncio.AsyncEngine':
+        """
+        Create the async database engine.
+        """
+        _import_optional('asyncpg', 'AsyncPostgres', extra='async')
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        con_str = f'postgresql+asyncpg://{self.pg_user}@{self.hostname}:{self.port}/{self.db_name}'
+        engine_kwargs = dict(pool_size=self.pool_size,
+                             max_overflow=self.max_overflow,
+                             pool_pre_ping=self.pool_pre_ping,
+                             pool_recycle=self.pool_recycle)
+
+        if self.statement_timeout is not None:
+            engine_kwargs['connect_args'] = dict(server_settings=dict(statement_timeout=str(int(self.statement_timeout))))
+
+        return create_async_engine(con_str, **engine_kwargs)
+
+    async def aclose(self) -> None:
+        """
+        Dispose of the async database engine and close its pooled connections.
+        """
+        if self._dbcon is not None:
+            await self._dbcon.dispose()
+            self._dbcon = None
+
+    async def _run(self, coro: typing.Awaitable, timeout: float=None) -> typing.Any:
+        """
+        Await `coro` once a concurrency slot is free, cancelling it after `timeout` seconds.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        timeout = self.timeout if timeout is None else timeout
+        async with self._semaphore:
+            if timeout is None:
+                return await coro
+
+            return await asyncio.wait_for(coro, timeout)
+
+    async def execute(self,
+                      sql: str,
+                      logfile: typing.Union[str, pathlib.Path]=None,
+                      log_stats: bool=False,
+                      timeout: float=None) -> None:
+        """
+        Execute a SQL string or a list of SQL statements one after another in a single
+        transaction. See `Postgres.execute()` for `logfile` and `log_stats`. To run independent
+        statements concurrently, gather several `execute()` calls instead.
+        """
+        sql = ensurelist(sql)
+        helper = self._calling_helper('execute') if self.stats_sink is not None else None
+
+        async def run():
+            async with self.dbcon.begin() as con:
+                for stmt in sql:
+                    start = time.perf_counter()
+                    result = await con.execute(sqlalchemy.text(stmt))
+                    duration = time.perf_counter() - start
+
+                    if log_writer is not None:
+                        log_writer.write(self._log_entry(stmt, duration, result.rowcount, log_stats))
+
+                    if self.stats_sink is not None:
+                        self._record_query(stmt, duration, rows=result.rowcount, helper=helper)
+
+        if logfile is not None:
+            logger.info(f'Writing SQL query log to file "{logfile}"')
+
+        log_writer = BufferedLogWriter(logfile) if logfile is not None else None
+        try:
+            await self._run(run(), timeout=timeout)
+        finally:
+            if log_writer is not None:
+                log_writer.close()
+
+    async def read_sql(self,
+                       sql: str,
+                       simplify: bool=True,
+                       params: dict=None,
+                       timeout: float=None) -> typing.Union['pd.Series', 'pd.DataFrame']:
+        """
+        Execute SQL and read results into a dataframe, optionally simplified to a Series if
+        the result is a single-column dataframe. Optionally pass `params` to bind values to
+        `:name` placeholders in `sql`.
+        """
+        helper = self._calling_helper('read_sql') if self.stats_sink is not None else None
+
+        async def run():
+            async with self.dbcon.connect() as con:
+                result = await con.execute(sqlalchemy.text(sql), params or {})
+                return pd.DataFrame.from_records([tuple(row) for row in result.fetchall()], columns=list(result.keys()))
+
+        start = time.perf_counter()
+        res = await self._run(run(), timeout=timeout)
+
+        if self.stats_sink is not None:
+            self._record_query(sql,
+                               time.perf_counter() - start,
+                               rows=len(res),
+                               nbytes=int(res.memory_usage(index=False, deep=True).sum()),
+                               helper=helper)
+
+        if res.shape[1] == 1:
+            if simplify:
+                logger.info(f'Simplifying result data to pd.Series, length: {str(len(res))}')
+                res = res.iloc[:, 0]
+
+        return res
+
+    async def read_sql_chunks(self,
+                              sql: str,
+                              chunksize: int=10000,
+                              simplify: bool=True,
+                              params: dict=None,
+                              as_tuples: bool=False) -> typing.AsyncIterator[typing.Union['pd.Series', 'pd.DataFrame', list]]:
+        """
+        Execute SQL and asynchronously yield results in chunks of at most `chunksize` rows,
+        fetched from a server-side cursor. See `Postgres.read_sql_chunks()`. A concurrency slot
+        is held until the iteration completes, and `timeout` does not apply.
+        """
+        assert chunksize > 0, '`chunksize` must be a positive integer'
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._semaphore:
+            async with self.dbcon.connect() as con:
+                result = await con.stream(sqlalchemy.text(sql), params or {})
+                columns = list(result.keys())
+                async for rows in result.partitions(chunksize):
+                    if as_tuples:
+                        res = [tuple(row) for row in rows]
+                    else:
+                        res = pd.DataFrame.from_records([tuple(row) for row in rows], columns=columns)
+                        if res.shape[1] == 1 and simplify:
+                            res = res.iloc[:, 0]
+
+                    yield res
+
+    async def read_table(self,
+                         schema_name: str,
+                         table_name: str,
+                         chunksize: int=None,
+                         timeout: float=None) -> typing.Union['pd.DataFrame', typing.AsyncIterator['pd.DataFrame']]:
+        """
+        Read an entire SQL table or view as a dataframe. If `chunksize` is given, return an
+        async iterator of dataframes of at most `chunksize` rows each instead.
+        """
+        sql = self._read_table_sql(schema_name, table_name)
+        if chunksize is not None:
+            return self.read_sql_chunks(sql, chunksize=chunksize, simplify=False)
+
+        df = await self.read_sql(sql, simplify=False, timeout=timeout)
+        logger.info(f"Read dataframe {schema_name}.{table_name}, shape: {df.shape}")
+        return df
+
+    #
+    # Metadata
+    #
+
+    def _table_columns(self, schema_name: str, table_name: str) -> dict:
+        """
+        Get column metadata of a table from the metadata cache. Used by the inherited
+        synchronous helpers, i.e. `validate_dtype()`, which cannot query the database.
+        """
+        table_columns = self._cached_table_columns(schema_name, table_name)
+        if table_columns is None:
+            raise Exception(f'Column metadata of {schema_name}.{table_name} is not cached, '
+                            'await `prefetch_metadata()` first')
+
+        return table_columns
+
+    async def _fetch_table_columns(self, schema_name: str, table_name: str) -> dict:
+        """
+        Get column metadata of a table from the metadata cache, or query and cache it.
+        """
+        table_columns = self._cached_table_columns(schema_name, table_name)
+        if table_columns is not None:
+            return table_columns
+
+        params = dict(schema_name=schema_name, table_name=table_name)
+        df = await self.read_sql(TABLE_COLUMNS_SQL, simplify=False, params=params)
+        return self._cache_table_columns(schema_name, table_name, df)
+
+    async def prefetch_metadata(self, schema_name: str, table_names: typing.Union[str, list]) -> None:
+        """
+        Cache column metadata of one or more tables of a schema, so that synchronous helpers
+        such as `validate_dtype()` may use it.
+        """
+        await asyncio.gather(*[self._fetch_table_columns(schema_name, x) for x in ensurelist(table_names)])
+
+    async def col_names(self, schema_name: str, table_name: str) -> list:
+        """
+        Get column names of table as a list.
+        """
+        return list(await self._fetch_table_columns(schema_name, table_name))
+
+    async def col_dtypes(self, schema_name: str, table_name: str) -> dict:
+        """
+        Get column datatypes of table as a dictionary.
+        """
+        table_columns = await self._fetch_table_columns(schema_name, table_name)
+        return {col: metadata['data_type'] for col, metadata in table_columns.items()}
+
+    async def infoschema(self, infoschema_table: str) -> 'pd.DataFrame':
+        """
+        Query from information_schema.
+        """
+        return await self.read_sql(f'select * from information_schema.{infoschema_table}')
+
+    async def list_tables(self, schema_name: str=None) -> 'pd.DataFrame':
+        """
+        Query the system catalog for a list of tables present in the database connection.
+        """
+        sql, params = self._list_tables_sql(schema_name)
+        return await self.read_sql(sql, params=params)
+
+    async def list_views(self, schema_name: str=None) -> 'pd.DataFrame':
+        """
+        Query the system catalog for a list of views present in the database connection.
+        """
+        sql, params = self._list_views_sql(schema_name)
+        return await self.read_sql(sql, params=params)
+
+    async def list_triggers(self, trigger_schema: str=None) -> 'pd.DataFrame':
+        """
+        Query information schema for a list of triggers present in the database connection.
+        """
+        sql, params = self._list_triggers_sql(trigger_schema)
+        return await self.read_sql(sql, params=params)
+
+    async def table_exists(self, schema_name: str=None, table_name: str=None) -> bool:
+        """
+        Return a boolean indicating whether a table is existent in the database connection
+        """
+        sql, params = self._relation_exists_sql(schema_name, table_name, RELKINDS['table'])
+        return bool((await self.read_sql(sql, params=params)).iloc[0])
+
+    async def view_exists(self, schema_name: str=None, view_name: str=None) -> bool:
+        """
+        Return a boolean indicating whether a view is existent in the database connection
+        """
+        sql, params = self._relation_exists_sql(schema_name, view_name, RELKINDS['view'])
+        return bool((await self.read_sql(sql, params=params)).iloc[0])
+
+    async def table_or_view_exists(self, schema_name: str=None, table_or_view_name: str=None) -> bool:
+        """
+        Determine whether a table or view exists in the database connection.
+        """
+        sql, params = self._relation_exists_sql(schema_name, table_or_view_name, RELKINDS['table_or_view'])
+        return bool((await self.read_sql(sql, params=params)).iloc[0])
+
+    async def exists_many(self, names: typing.Iterable[typing.Union[str, tuple]], kind: str='table') -> dict:
+        """
+        Determine which of many relations exist, with a single catalog query. See
+        `Postgres.exists_many()`.
+        """
+        assert kind in RELKINDS, f'`kind` must be one of {list(RELKINDS)}'
+        names = [names] if isinstance(names, str) else list(names)
+        relations = self._parse_relation_names(names)
+        existing = await self._existing_relations(relations, relkinds=RELKINDS[kind])
+        return {name: relation in existing for name, relation in zip(names, relations)}
+
+    async def trigger_exists(self, trigger_schema: str=None, trigger_name: str=None) -> bool:
+        """
+        Return a boolean indicating whether a trigger is existent in the database connection
+        """
+        sql, params = self._trigger_exists_sql(trigger_schema, trigger_name)
+        return bool((await self.read_sql(sql, params=params)).iloc[0])
+
+    #
+    # DDL
+    #
+
+    async def create_schema(self, schema_name: str) -> None:
+        """
+        Create a Postgres schema.
+        """
+        await self.execute(self._create_schema_sql(schema_name))
+        self.invalidate_metadata(schema_name)
+
+    async def drop_schema(self, schema_name: str, if_exists: bool=False, cascade: bool=False) -> None:
+        """
+        Drop a Postgres schema.
+        """
+        await self.execute(self._drop_schema_sql(schema_name, if_exists=if_exists, cascade=cascade))
+        self._invalidate_dropped(schema_name, cascade=cascade)
+
+    async def drop_schema_and_recreate(self, schema_name: str, if_exists: bool=False, cascade: bool=False) -> None:
+        """
+        Drop a Postgres schema and then create it again.
+        """
+        await self.drop_schema(schema_name, if_exists=if_exists, cascade=cascade)
+        await self.create_schema(schema_name)
+
+    async def create_table(self, schema_name: str, table_name: str, columnspec: dict, if_not_exists: bool=False) -> None:
+        """
+        Create a Postgres table given a schema name, table name and column specification. See
+        `Postgres.create_table()`.
+        """
+        await self.execute(self._create_table_sql(schema_name, table_name, columnspec, if_not_exists=if_not_exists))
+        self.invalidate_metadata(schema_name, table_name)
+
+    async def wipe_table(self,
+                         schema_name: str,
+                         table_name: str,
+                         truncate: bool=False,
+                         restart_identity: bool=False,
+                         cascade: bool=False) -> None:
+        """
+        Delete all records in a table but do not drop the table. See `Postgres.wipe_table()`.
+        """
+        if not len(await self._existing_relations([(schema_name, table_name)])):
+            return
+
+        if truncate:
+            await self.execute(self._truncate_sql([(schema_name, table_name)], restart_identity=restart_identity, cascade=cascade))
+        else:
+            await self.execute(self._wipe_table_sql(schema_name, table_name))
+
+    async def truncate_tables(self,
+                              tables: typing.Iterable[typing.Union[str, tuple]],
+                              restart_identity: bool=False,
+                              cascade: bool=False) -> list:
+        """
+        Empty many tables with a single `TRUNCATE` statement. See `Postgres.truncate_tables()`.
+        """
+        tables = self._parse_relation_names(tables)
+        existing = await self._existing_relations(tables)
+        tables = [x for x in tables if x in existing]
+
+        if len(tables):
+            await self.execute(self._truncate_sql(tables, restart_identity=restart_identity, cascade=cascade))
+
+        return tables
+
+    async def _existing_relations(self, names: list, relkinds: list=RELKINDS['table']) -> set:
+        """
+        Get the subset of (schema, name) tuples that exist as relations of the given kinds.
+        """
+        if not len(names):
+            return set()
+
+        sql, params = self._existing_relations_sql(names, relkinds)
+        df = await self.read_sql(sql, simplify=False, params=params)
+        return set(zip(df['schema_name'], df['relation_name']))
+
+    async def drop_table(self, schema_name: str, table_name: str, if_exists: bool=False, cascade: bool=False) -> None:
+        """
+        Drop a Postgres table.
+        """
+        await self.execute(self._drop_relation_sql('table', schema_name, table_name, if_exists=if_exists, cascade=cascade))
+        self._invalidate_dropped(schema_name, table_name, cascade=cascade)
+
+    async def create_view(self, schema_name: str, view_name: str, view_sql: str, or_replace: bool=False) -> None:
+        """
+        Create a view from user-passed SQL.
+        """
+        await self.execute(self._create_view_sql(schema_name, view_name, view_sql, or_replace=or_replace))
+        self.invalidate_metadata(schema_name, view_name)
+
+    async def drop_view(self, schema_name: str, view_name: str, if_exists: bool=False, cascade: bool=False) -> None:
+        """
+        Drop a Postgres view.
+        """
+        await self.execute(self._drop_relation_sql('view', schema_name, view_name, if_exists=if_exists, cascade=cascade))
+        self._invalidate_dropped(schema_name, view_name, cascade=cascade)
+
+    copy_from_rows = _sync_only('copy_from_rows')
+    copy_from_dataframe = _sync_only('copy_from_dataframe')
+    dump = _sync_only('dump')
+    dump_tables = _sync_only('dump_tables')
+    export_table = _sync_only('export_table')
+    import_table = _sync_only('import_table')
+    read_arrow = _sync_only('read_arrow')
+    bulk_update = _sync_only('bulk_update')
+    upsert = _sync_only('upsert')
+    delete_many = _sync_only('delete_many')
@@ -1,14 +1,38 @@
-import click
+import collections
 import datetime
+import importlib
+import io
 import logging
 import os
 import pathlib
 import re
+import signal
 import subprocess
 import sys
 import threading
 import typing
-from dateutil.tz import tzoffset
+
+
+class LazyModule(object):
+    """
+    Stand-in for a module that is imported on first attribute access, i.e.
+
+        pd = LazyModule('pandas')
+        pd.DataFrame  # pandas is imported here
+    """
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr: str) -> typing.Any:
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+
+        return getattr(self._module, attr)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<LazyModule '{self._name}' ({state})>"
 
 
 class ExtendedLogger(logging.Logger):
@@ -26,6 +50,9 @@ class ExtendedLogger(logging.Logger):
         """
         msg = re.sub(r'\s+', ' ', msg.strip())
 
+        if bold or arrow is not None:
+            import click
+
         if bold:
             msg = click.style(msg, bold=True)
 
@@ -88,186 +115,369 @@ def logger_setup(name: str=__name__, level: int=logging.DEBUG) -> logging.Logger
 logger = logger_setup(name='sql-query-tools.utils', level=logging.WARNING)
 
 
-def assert_value_dtype(value: typing.Any, dtype: str, return_coerced_value: bool=False, stop: bool=False) -> bool:
+class StringIteratorIO(io.TextIOBase):
     """
-    Test if a value is an instance of type `dtype`. May accept a value of any kind.
+    Read-only file-like object over an iterable of strings. Lets generated text be streamed
+    to consumers that expect a file (i.e. `COPY ... FROM STDIN`) without first building the
+    entire text in memory.
+    """
+    def __init__(self, iterable: typing.Iterable[str]) -> None:
+        self._iter = iter(iterable)
+        self._buf = ''
 
-    Parameter `dtype` must be one of ['bool', 'str', 'string', 'int', 'integer',
-    'float', 'date', 'datetime', 'path', 'path exists'].
+    def readable(self) -> bool:
+        return True
 
-    Parameter `return_coerced_value` will cause this function to return `value` as type
-    `dtype` if possible, and will raise an error otherwise.
+    def _read1(self, n: int=None) -> str:
+        """
+        Read at most `n` characters from the current buffer, refilling it if empty.
+        """
+        while not self._buf:
+            try:
+                self._buf = next(self._iter)
+            except StopIteration:
+                break
+
+        chunk = self._buf[:n]
+        self._buf = self._buf[len(chunk):]
+        return chunk
+
+    def read(self, n: int=None) -> str:
+        chunks = []
+        if n is None or n < 0:
+            while True:
+                chunk = self._read1()
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        else:
+            while n > 0:
+                chunk = self._read1(n)
+                if not chunk:
+                    break
+                n -= len(chunk)
+                chunks.append(chunk)
 
-    Parameter `stop` will cause this function to raise an error if `value` cannot be
-    coerced to `dtype` instead of simply logging the error message.
+        return ''.join(chunks)
+
+
+class BufferedLogWriter(object):
+    """
+    Append lines to a textfile from an in-memory buffer instead of reopening the file for
+    every line. The buffer is flushed by a background thread every `flush_interval` seconds,
+    as soon as it holds `max_buffered` lines, and on `flush()` or `close()`. May be used
+    as a context manager, which closes the writer on exit.
     """
-    class Attribute():
+    def __init__(self,
+                 fpath: typing.Union[str, pathlib.Path],
+                 flush_interval: float=1.0,
+                 max_buffered: int=10000) -> None:
+        self.fpath = fpath
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+
+        self._file = open(fpath, 'a')
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def write(self, line: str) -> None:
+        """
+        Add a line to the buffer. Lines must include their own trailing newline.
+        """
+        with self._buffer_lock:
+            self._buffer.append(line)
+            full = len(self._buffer) >= self.max_buffered
+
+        if full:
+            self._wake.set()
+
+    def flush(self) -> None:
         """
-        Empty class defined for convenient use.
+        Write all buffered lines to the file.
         """
-        pass
+        with self._file_lock:
+            with self._buffer_lock:
+                lines, self._buffer = self._buffer, []
+
+            if len(lines) and not self._file.closed:
+                self._file.write(''.join(lines))
+                self._file.flush()
 
-    def define_date_regex():
+    def close(self) -> None:
         """
-        Define regex strings for all valid date components.
+        Stop the background thread, flush remaining lines and close the file.
         """
-        rgx = Attribute()
-        rgx.sep = r'(\.|\/|-|_|\:)'
+        if self._closed.is_set():
+            return
 
-        rgx.year = r'(?P<year>\d{4})'
-        rgx.month = r'(?P<month>\d{2})'
-        rgx.day = r'(?P<day>\d{2})'
+        self._closed.set()
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        self._file.close()
 
-        rgx.hour = r'(?P<hour>\d{2})'
-        rgx.minute = r'(?P<minute>\d{2})'
-        rgx.second = r'(?P<second>\d{2})'
-        rgx.microsecond = r'(?P<microsecond>\d+)'
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
 
-        rgx.tz_sign = r'(?P<tz_sign>-|\+)'
-        rgx.tz_hour = r'(?P<tz_hour>\d{1,2})'
-        rgx.tz_minute = r'(?P<tz_minute>\d{1,2})'
 
-        rgx.date = f'{rgx.year}{rgx.sep}{rgx.month}{rgx.sep}{rgx.day}'
-        rgx.datetime = fr'{rgx.date} {rgx.hour}{rgx.sep}{rgx.minute}{rgx.sep}{rgx.second}'
-        rgx.datetime_timezone = fr'{rgx.datetime}{rgx.tz_sign}{rgx.tz_hour}(:){rgx.tz_minute}'
-        rgx.datetime_microsecond = fr'{rgx.datetime}(\.){rgx.microsecond}'
+class MemoryStatsSink(object):
+    """
+    Default sink for query instrumentation events. Aggregate events in memory by helper name,
+    keeping exact counts and totals, and the most recent `max_samples` durations per helper
+    from which percentiles are computed.
 
-        return rgx
+    Any object with a `record(event: dict)` method may be used as a sink instead, for
+    example to forward events to a metrics backend.
+    """
+    def __init__(self, max_samples: int=10000) -> None:
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self.reset()
 
-    def anchor(x):
+    def record(self, event: dict) -> None:
         """
-        Add regex start and end anchors to a string.
+        Record a single query event with keys `helper`, `sql`, `duration`, `rows` and `bytes`.
         """
-        return '^' + x + '$'
+        with self._lock:
+            stats = self._stats.get(event['helper'])
+            if stats is None:
+                stats = dict(count=0,
+                             total_duration=0.0,
+                             rows=0,
+                             bytes=0,
+                             durations=collections.deque(maxlen=self.max_samples))
+                self._stats[event['helper']] = stats
+
+            stats['count'] += 1
+            stats['total_duration'] += event['duration']
+            stats['rows'] += event['rows'] or 0
+            stats['bytes'] += event['bytes'] or 0
+            stats['durations'].append(event['duration'])
+
+    def summary(self, percentiles: list=[50, 95, 99]) -> dict:
+        """
+        Get aggregated statistics per helper in format:
 
+            {helper: {'count': ..., 'total_duration': ..., 'rows': ..., 'bytes': ..., 'p50': ..., ...}}
 
-    valid_dtypes = ['bool',
-                    'str', 'string',
-                    'int', 'integer',
-                    'float',
-                    'date',
-                    'datetime',
-                    'path',
-                    'path exists']
-    assert dtype in valid_dtypes, f"Datatype must be one of {', '.join(valid_dtypes)}"
+        Durations are in seconds.
+        """
+        with self._lock:
+            summary = {}
+            for helper, stats in self._stats.items():
+                durations = sorted(stats['durations'])
+                helper_summary = {k: v for k, v in stats.items() if k != 'durations'}
+                for pct in percentiles:
+                    # Nearest-rank percentile
+                    rank = max(1, int(-(-pct * len(durations) // 100)))
+                    helper_summary[f'p{pct}'] = durations[rank - 1] if len(durations) else None
 
-    # Date/datetime regex definitions
-    rgx = define_date_regex()
+                summary[helper] = helper_summary
 
-    coerced_value = None
+            return summary
 
-    # Test bool
-    if dtype == 'bool':
-        if isinstance(value, bool):
-            coerced_value = value
-        else:
-            if str(value).lower() in ['true', 't', 'yes', 'y']:
-                coerced_value = True
-            elif str(value).lower() in ['false', 'f', 'no', 'n']:
-                coerced_value = False
-
-    # Test string
-    elif dtype in ['str', 'string']:
-        try:
-            coerced_value = str(value)
-        except Exception as e:
-            if stop:
-                raise e
+    def reset(self) -> None:
+        """
+        Discard all recorded statistics.
+        """
+        with self._lock:
+            self._stats = {}
+
+
+class ValueParser(object):
+    """
+    Precompiled parser behind `assert_value_dtype()`. Date and datetime regexes are compiled
+    once, datetimes are matched with a single pattern covering the plain, timezone offset
+    and microsecond forms, and values that are already of the requested Python type skip
+    string conversion entirely.
+    """
+    sep = r'(\.|\/|-|_|\:)'
+
+    year = r'(?P<year>\d{4})'
+    month = r'(?P<month>\d{2})'
+    day = r'(?P<day>\d{2})'
+
+    hour = r'(?P<hour>\d{2})'
+    minute = r'(?P<minute>\d{2})'
+    second = r'(?P<second>\d{2})'
+    microsecond = r'(?P<microsecond>\d+)'
+
+    tz_sign = r'(?P<tz_sign>-|\+)'
+    tz_hour = r'(?P<tz_hour>\d{1,2})'
+    tz_minute = r'(?P<tz_minute>\d{1,2})'
+
+    date_pattern = f'{year}{sep}{month}{sep}{day}'
+    datetime_pattern = fr'{date_pattern} {hour}{sep}{minute}{sep}{second}'
+    datetime_suffix_pattern = fr'(?:{tz_sign}{tz_hour}(:){tz_minute}|(\.){microsecond})?'
+
+    def __init__(self) -> None:
+        self.date_regex = re.compile('^' + self.date_pattern + '$')
+        self.datetime_regex = re.compile('^' + self.datetime_pattern + self.datetime_suffix_pattern + '$')
+
+    def coerce(self, value: typing.Any, dtype: str, stop: bool=False) -> typing.Any:
+        """
+        Coerce `value` to `dtype`, returning None if not possible. Parameter `stop` will cause
+        conversion errors to be raised instead of logged.
+        """
+        coerced_value = None
+
+        # Test bool
+        if dtype == 'bool':
+            if isinstance(value, bool):
+                coerced_value = value
             else:
-                logger.warning(str(e))
-
-    # Test integer
-    elif dtype in ['int', 'integer']:
-        if isinstance(value, int):
-            coerced_value = value
-        elif str(value).isdigit():
-            coerced_value = int(value)
-        else:
+                value_lower = str(value).lower()
+                if value_lower in ['true', 't', 'yes', 'y']:
+                    coerced_value = True
+                elif value_lower in ['false', 'f', 'no', 'n']:
+                    coerced_value = False
+
+        # Test string
+        elif dtype in ['str', 'string']:
             try:
-                coerced_value = int(value)
+                coerced_value = str(value)
             except Exception as e:
                 if stop:
                     raise e
                 else:
                     logger.warning(str(e))
 
-    # Test float
-    elif dtype == 'float':
-        if isinstance(value, float) or isinstance(value, int):
-            coerced_value = float(value)
-        elif '.' in str(value):
-            try:
+        # Test integer
+        elif dtype in ['int', 'integer']:
+            if isinstance(value, int):
+                coerced_value = value
+            elif str(value).isdigit():
+                coerced_value = int(value)
+            else:
+                try:
+                    coerced_value = int(value)
+                except Exception as e:
+                    if stop:
+                        raise e
+                    else:
+                        logger.warning(str(e))
+
+        # Test float
+        elif dtype == 'float':
+            if isinstance(value, float) or isinstance(value, int):
                 coerced_value = float(value)
-            except Exception as e:
-                if stop:
-                    raise e
-                else:
-                    logger.warning(str(e))
+            elif '.' in str(value):
+                try:
+                    coerced_value = float(value)
+                except Exception as e:
+                    if stop:
+                        raise e
+                    else:
+                        logger.warning(str(e))
+
+        # Test date
+        elif dtype == 'date':
+            if type(value) is datetime.date:
+                coerced_value = datetime.datetime(value.year, value.month, value.day)
+            elif not isinstance(value, datetime.datetime):
+                m = self.date_regex.search(str(value).strip())
+                if m:
+                    coerced_value = datetime.datetime(year=int(m.group('year')),
+                                                      month=int(m.group('month')),
+                                                      day=int(m.group('day')))
+
+        # Test datetime
+        elif dtype == 'datetime':
+            if type(value) is datetime.datetime and value.tzinfo is None:
+                coerced_value = value
+            else:
+                coerced_value = self._coerce_datetime_string(str(value).strip())
+
+        # Test path
+        elif dtype == 'path':
+            if '/' in value or value == '.':
+                coerced_value = value
+
+        # Test path exists
+        elif dtype == 'path exists':
+            if os.path.isfile(value) or os.path.isdir(value):
+                coerced_value = value
 
-    # Test date
-    elif dtype == 'date':
-        m = re.search(anchor(rgx.date), str(value).strip())
-        if m:
-            dt_components = dict(year=m.group('year'), month=m.group('month'), day=m.group('day'))
-            dt_components = {k: int(v) for k, v in dt_components.items()}
-            coerced_value = datetime.datetime(**dt_components)
-
-    # Test datetime
-    elif dtype == 'datetime':
-        m_dt = re.search(anchor(rgx.datetime), str(value).strip())
-        m_dt_tz = re.search(anchor(rgx.datetime_timezone), str(value).strip())
-        m_dt_ms = re.search(anchor(rgx.datetime_microsecond), str(value).strip())
-
-        if m_dt:
-            dt_components = dict(year=m_dt.group('year'),
-                                 month=m_dt.group('month'),
-                                 day=m_dt.group('day'),
-                                 hour=m_dt.group('hour'),
-                                 minute=m_dt.group('minute'),
-                                 second=m_dt.group('second'))
-            dt_components = {k: int(v) for k, v in dt_components.items()}
-            coerced_value = datetime.datetime(**dt_components)
-
-        elif m_dt_tz:
-            dt_components = dict(year=m_dt_tz.group('year'),
-                                 month=m_dt_tz.group('month'),
-                                 day=m_dt_tz.group('day'),
-                                 hour=m_dt_tz.group('hour'),
-                                 minute=m_dt_tz.group('minute'),
-                                 second=m_dt_tz.group('second'))
-            dt_components = {k: int(v) for k, v in dt_components.items()}
-
-            second_offset = int(m_dt_tz.group('tz_hour')) * 60 * 60
-            second_offset = -second_offset if m_dt_tz.group('tz_sign') == '-' else second_offset
+        return coerced_value
 
+    def _coerce_datetime_string(self, value: str) -> typing.Optional[datetime.datetime]:
+        """
+        Parse a datetime string, optionally with a timezone offset or microseconds.
+        """
+        m = self.datetime_regex.search(value)
+        if not m:
+            return None
+
+        dt_components = dict(year=m.group('year'),
+                             month=m.group('month'),
+                             day=m.group('day'),
+                             hour=m.group('hour'),
+                             minute=m.group('minute'),
+                             second=m.group('second'))
+
+        if m.group('microsecond') is not None:
+            dt_components['microsecond'] = m.group('microsecond')
+
+        dt_components = {k: int(v) for k, v in dt_components.items()}
+
+        if m.group('tz_sign') is not None:
+            from dateutil.tz import tzoffset
+            second_offset = int(m.group('tz_hour')) * 60 * 60
+            second_offset = -second_offset if m.group('tz_sign') == '-' else second_offset
             dt_components['tzinfo'] = tzoffset(None, second_offset)
-            coerced_value = datetime.datetime(**dt_components)
-
-        elif m_dt_ms:
-            dt_components = dict(year=m_dt_ms.group('year'),
-                                 month=m_dt_ms.group('month'),
-                                 day=m_dt_ms.group('day'),
-                                 hour=m_dt_ms.group('hour'),
-                                 minute=m_dt_ms.group('minute'),
-                                 second=m_dt_ms.group('second'),
-                                 microsecond=m_dt_ms.group('microsecond'))
-            dt_components = {k: int(v) for k, v in dt_components.items()}
-            coerced_value = datetime.datetime(**dt_components)
-
-    # Test path
-    elif dtype == 'path':
-        if '/' in value or value == '.':
-            coerced_value = value
-
-    # Test path exists
-    elif dtype == 'path exists':
-        if os.path.isfile(value) or os.path.isdir(value):
-            coerced_value = value
+
+        return datetime.datetime(**dt_components)
+
+
+value_parser = ValueParser()
+
+valid_value_dtypes = frozenset(['bool',
+                                'str', 'string',
+                                'int', 'integer',
+                                'float',
+                                'date',
+                                'datetime',
+                                'path',
+                                'path exists'])
+
+
+def assert_value_dtype(value: typing.Any, dtype: str, return_coerced_value: bool=False, stop: bool=False) -> bool:
+    """
+    Test if a value is an instance of type `dtype`. May accept a value of any kind.
+
+    Parameter `dtype` must be one of ['bool', 'str', 'string', 'int', 'integer',
+    'float', 'date', 'datetime', 'path', 'path exists'].
+
+    Parameter `return_coerced_value` will cause this function to return `value` as type
+    `dtype` if possible, and will raise an error otherwise.
+
+    Parameter `stop` will cause this function to raise an error if `value` cannot be
+    coerced to `dtype` instead of simply logging the error message.
+    """
+    assert dtype in valid_value_dtypes, f"Datatype must be one of {', '.join(sorted(valid_value_dtypes))}"
+
+    coerced_value = value_parser.coerce(value, dtype, stop=stop)
 
     # Close function
     if coerced_value is None:
-        debug_str = f"Unable to coerce value '{str(value)}' (dtype: {type(value).__name__}) to {dtype}"
-        logger.debug(debug_str)
+        if return_coerced_value or logger.isEnabledFor(logging.DEBUG):
+            debug_str = f"Unable to coerce value '{str(value)}' (dtype: {type(value).__name__}) to {dtype}"
+            logger.debug(debug_str)
 
         if return_coerced_value:
             raise ValueError(debug_str)
@@ -414,6 +624,8 @@ def syscmd(cmd: typing.Union[str, list], encoding: str='') -> typing.Union[str,
     Runs a command on the system, waits for the command to finish, and then returns the
     text output of the command. If the command produces no text output, the command's
     return code will be returned instead. Optionally decode output bytestring.
+
+    The entire output is held in memory, use `run_cmd()` for commands with large output.
     """
     p = subprocess.Popen(cmd,
                          shell=True,
@@ -422,8 +634,9 @@ def syscmd(cmd: typing.Union[str, list], encoding: str='') -> typing.Union[str,
                          stderr=subprocess.STDOUT,
                          close_fds=True)
 
-    p.wait()
-    output = p.stdout.read()
+    # Read output while waiting, as a child writing more than the pipe buffer would
+    # otherwise block forever
+    output, _ = p.communicate()
 
     if len(output) > 1:
         if encoding > '' and isinstance(output, bytes):
@@ -434,3 +647,104 @@ def syscmd(cmd: typing.Union[str, list], encoding: str='') -> typing.Union[str,
         logger.warning('Length of `output` is <=1, returning the process returncode')
 
         return p.returncode
+
+
+def run_cmd(cmd: typing.Union[str, list],
+            callback: typing.Callable[[typing.Union[str, bytes]], typing.Any]=None,
+            chunksize: int=None,
+            stderr_callback: typing.Callable[[str], typing.Any]=None,
+            timeout: float=None,
+            tail_lines: int=100,
+            encoding: str='utf-8',
+            cwd: typing.Union[str, pathlib.Path]=None,
+            env: dict=None) -> typing.Tuple[int, list]:
+    """
+    Run a command on the system and stream its output as it is written, instead of waiting
+    for the command to finish. A string `cmd` is run through the shell, and a list is run
+    directly as an argv.
+
+    Each line of output is decoded and passed to `callback` without its trailing newline.
+    Stderr is merged into stdout unless `stderr_callback` is given, in which case stderr
+    lines are passed to it instead. If `chunksize` is given, stdout is passed to `callback`
+    undecoded, in chunks of at most `chunksize` bytes, and stderr is kept separate.
+
+    Only the last `tail_lines` lines of text output are held in memory. Return a tuple of the
+    command's return code and a list of those lines. If the command runs for longer than
+    `timeout` seconds it is killed, and `subprocess.TimeoutExpired` is raised.
+    """
+    separate_stderr = stderr_callback is not None or chunksize is not None
+    tail = collections.deque(maxlen=tail_lines)
+
+    # Run the command in its own process group, so that killing it also kills any children
+    # spawned by the shell, which would otherwise hold the pipes open
+    p = subprocess.Popen(cmd,
+                         shell=isinstance(cmd, str),
+                         stdin=subprocess.DEVNULL,
+                         stdout=subprocess.PIPE,
+                         stderr=subprocess.PIPE if separate_stderr else subprocess.STDOUT,
+                         cwd=cwd,
+                         env=env,
+                         start_new_session=os.name == 'posix')
+
+    def kill():
+        if os.name == 'posix':
+            try:
+                os.killpg(p.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        else:
+            p.kill()
+
+    def read_lines(stream, line_callback):
+        for line in io.TextIOWrapper(stream, encoding=encoding, errors='replace'):
+            line = line.rstrip('\r\n')
+            tail.append(line)
+            if line_callback is not None:
+                line_callback(line)
+
+    timed_out = threading.Event()
+
+    def expire():
+        timed_out.set()
+        kill()
+
+    timer = threading.Timer(timeout, expire) if timeout is not None else None
+    stderr_reader = threading.Thread(target=read_lines, args=(p.stderr, stderr_callback), daemon=True) \
+        if separate_stderr else None
+
+    try:
+        if timer is not None:
+            timer.start()
+
+        if stderr_reader is not None:
+            stderr_reader.start()
+
+        if chunksize is not None:
+            for chunk in iter(lambda: p.stdout.read1(chunksize), b''):
+                if callback is not None:
+                    callback(chunk)
+        else:
+            read_lines(p.stdout, callback)
+
+        if stderr_reader is not None:
+            stderr_reader.join()
+
+        returncode = p.wait()
+
+    except BaseException:
+        kill()
+        p.wait()
+        raise
+
+    finally:
+        if timer is not None:
+            timer.cancel()
+
+        p.stdout.close()
+        if separate_stderr:
+            p.stderr.close()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout, output='\n'.join(tail))
+
+    return returncode, list(tail)
@@ -3,10 +3,19 @@
 """Tests for `sql_query_tools` package."""
 
 
+import asyncio
+import importlib.util
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import pandas as pd
 import unittest
 from os import getpid
-from sql_query_tools import Postgres
-from sql_query_tools.utils import find_binary
+from sql_query_tools import Postgres, AsyncPostgres
+from sql_query_tools.utils import find_binary, run_cmd, syscmd, BufferedLogWriter
 
 
 class TestSQLQueryTools(unittest.TestCase):
@@ -30,6 +39,16 @@ class TestSQLQueryTools(unittest.TestCase):
             # Method: read_sql(). Choose a default table that always exists
             result = pg.read_sql('select * from information_schema.tables limit 1')
 
+            # Method: connect(). Instances with equal settings share one engine
+            self.assertIs(Postgres().dbcon, pg.dbcon)
+
+            # Query instrumentation
+            pg_instrumented = Postgres(instrument=True)
+            pg_instrumented.col_names(schema_name='pg_catalog', table_name='pg_stat_database')
+            result = pg_instrumented.stats_sink.summary()
+            self.assertEqual(result['col_names']['count'], 1)
+            self.assertGreater(result['col_names']['rows'], 0)
+
             # Method: get_table_name()
             self.assertEqual(pg.get_table_name(schema_name=None, table_name='pg_stat'), 'pg_stat')
             self.assertEqual(pg.get_table_name(schema_name='information_schema', table_name='tables'), 'information_schema.tables')
@@ -46,6 +65,11 @@ class TestSQLQueryTools(unittest.TestCase):
                                        val=5)
             self.assertEqual(result, False)
 
+            # Method: invalidate_metadata(). Column metadata is cached by validate_dtype()
+            self.assertIn(('information_schema', 'tables'), pg._metadata_cache)
+            pg.invalidate_metadata(schema_name='information_schema', table_name='tables')
+            self.assertNotIn(('information_schema', 'tables'), pg._metadata_cache)
+
             # Method: infoschema()
             result = sorted(pg.infoschema(infoschema_table='tables').columns)
             result_sql_direct = sorted(pg.read_sql('select * from information_schema.tables limit 1').columns)
@@ -91,6 +115,26 @@ class TestSQLQueryTools(unittest.TestCase):
             expectation = 'insert into pg_catalog.pg_stat_database ("tup_returned", "tup_fetched")\nvalues (11111, 22222)'
             self.assertEqual(result, expectation)
 
+            # Method: build_insert_many()
+            result = pg.build_insert_many(schema_name='pg_catalog',
+                                          table_name='pg_stat_database',
+                                          columns=['tup_returned', 'tup_fetched'],
+                                          rows=[[11111, 22222], [33333, None], [44444, 55555]],
+                                          chunksize=2)
+            expectation = ['insert into pg_catalog.pg_stat_database ("tup_returned", "tup_fetched") values (11111, 22222), (33333, null)',
+                           'insert into pg_catalog.pg_stat_database ("tup_returned", "tup_fetched") values (44444, 55555)']
+            self.assertEqual(result, expectation)
+
+            # Method: render_literals(). Dataframes render column-wise to the same statements
+            df = pd.DataFrame({'tup_returned': [11111, 33333], 'tup_fetched': [22222.5, None]})
+            result = pg.build_insert_many(schema_name='pg_catalog', table_name='pg_stat_database', rows=df)
+            expectation = pg.build_insert_many(schema_name='pg_catalog',
+                                               table_name='pg_stat_database',
+                                               columns=list(df.columns),
+                                               rows=list(df.itertuples(index=False, name=None)))
+            self.assertEqual(result, expectation)
+            self.assertEqual(pg.render_literals(['a', "b'c", 5, None]).tolist(), ["'a'", "'b''c'", '5', 'null'])
+
             # Method: build_delete()
             result = pg.build_delete(schema_name='pg_catalog',
                                      table_name='pg_stat_database',
@@ -106,6 +150,13 @@ class TestSQLQueryTools(unittest.TestCase):
                                      newlines=True)
             expectation = 'delete from pg_catalog.pg_stat_database\nwhere datid = 12345'
             self.assertEqual(result, expectation)
+            result = pg.build_delete_many(schema_name='pg_catalog',
+                                          table_name='pg_stat_database',
+                                          pkey_name='datid',
+                                          pkey_values=[1, 2, 3],
+                                          chunksize=2)
+            self.assertEqual(result, ['delete from pg_catalog.pg_stat_database where datid in (1, 2)',
+                                      'delete from pg_catalog.pg_stat_database where datid in (3)'])
 
             # Method: col_names()
             result = pg.col_names(schema_name='pg_catalog', table_name='pg_stat_database')
@@ -120,6 +171,11 @@ class TestSQLQueryTools(unittest.TestCase):
             self.assertGreater(result.shape[0], 0)
             self.assertGreater(result.shape[1], 0)
 
+            # Method: read_sql_chunks()
+            result = list(pg.read_sql_chunks('select generate_series(1, 5) as n', chunksize=2))
+            self.assertEqual([len(x) for x in result], [2, 2, 1])
+            self.assertEqual(result[0].tolist(), [1, 2])
+
             # Method: dump()
             # Just make sure pg_dump is installed
             find_binary('pg_dump', abort=True)
@@ -146,6 +202,16 @@ class TestSQLQueryTools(unittest.TestCase):
                 result = pg.table_exists(schema_name=test_schema_name, table_name=test_table_name)
                 self.assertTrue(result)
 
+                # Method: exists_many()
+                result = pg.exists_many([f'{test_schema_name}.{test_table_name}', (test_schema_name, 'nonexistent')])
+                self.assertEqual(result, {f'{test_schema_name}.{test_table_name}': True,
+                                          (test_schema_name, 'nonexistent'): False})
+
+                # A tuple of 'schema.name' strings is a sequence of names, not a (schema, name) pair
+                result = pg.exists_many((f'{test_schema_name}.{test_table_name}', f'{test_schema_name}.nonexistent'))
+                self.assertEqual(result, {f'{test_schema_name}.{test_table_name}': True,
+                                          f'{test_schema_name}.nonexistent': False})
+
                 pg.create_table(schema_name=test_schema_name,
                                 table_name=test_table_name,
                                 columnspec=columnspec,
@@ -167,6 +233,8 @@ class TestSQLQueryTools(unittest.TestCase):
 
                 result = pg.view_exists(schema_name=test_schema_name, view_name=test_view_name)
                 self.assertTrue(result)
+                self.assertTrue(pg.table_or_view_exists(schema_name=test_schema_name, table_or_view_name=test_view_name))
+                self.assertFalse(pg.table_exists(schema_name=test_schema_name, table_name=test_view_name))
 
                 pg.create_view(schema_name=test_schema_name,
                             view_name=test_view_name,
@@ -176,6 +244,53 @@ class TestSQLQueryTools(unittest.TestCase):
                 result = pg.read_table(schema_name=test_schema_name, table_name=test_view_name)
                 self.assertEqual(result.to_dict(), {'col1': {0: 5}, 'col2': {0: 'test'}})
 
+                # Method: copy_from_rows()
+                result = pg.copy_from_rows(rows=[(6, 'copied'), (7, None)],
+                                           schema_name=test_schema_name,
+                                           table_name=test_table_name,
+                                           columns=['col1', 'col2'])
+                self.assertEqual(result, 2)
+                result = pg.read_table(schema_name=test_schema_name, table_name=test_table_name)
+                self.assertEqual(result.shape[0], 3)
+
+                # Method: bulk_update()
+                result = pg.bulk_update(df=pd.DataFrame({'col1': [6, 7, 8], 'col2': ['updated', 'updated', 'missing']}),
+                                        schema_name=test_schema_name,
+                                        table_name=test_table_name,
+                                        pkey_name='col1',
+                                        chunksize=2)
+                self.assertEqual(result, 2)
+                result = pg.read_sql(f'select col2 from {test_schema_name}.{test_table_name} where col1 in (6, 7)')
+                self.assertEqual(result.tolist(), ['updated', 'updated'])
+
+                # Method: upsert()
+                pg.execute(f'create unique index on {test_schema_name}.{test_table_name} (col1)')
+                for method in ['values', 'copy']:
+                    result = pg.upsert(rows=pd.DataFrame({'col1': [5, 9 if method == 'values' else 10], 'col2': [method, method]}),
+                                       schema_name=test_schema_name,
+                                       table_name=test_table_name,
+                                       conflict_columns=['col1'],
+                                       method=method)
+                    self.assertEqual(result, {'inserted': 1, 'updated': 1})
+
+                # Method: delete_many()
+                for method, keys in [('any', [9, 11]), ('in', [10]), ('stage', [6, 7])]:
+                    result = pg.delete_many(schema_name=test_schema_name,
+                                            table_name=test_table_name,
+                                            pkey_name='col1',
+                                            pkey_values=keys,
+                                            method=method,
+                                            chunksize=1,
+                                            parallel=True)
+                    self.assertEqual(result, len([x for x in keys if x != 11]))
+
+                # Methods: wipe_table(), truncate_tables()
+                pg.wipe_table(schema_name=test_schema_name, table_name=test_table_name, truncate=True)
+                result = pg.read_table(schema_name=test_schema_name, table_name=test_table_name)
+                self.assertEqual(result.shape[0], 0)
+                result = pg.truncate_tables([f'{test_schema_name}.{test_table_name}', f'{test_schema_name}.nonexistent'])
+                self.assertEqual(result, [(test_schema_name, test_table_name)])
+
                 pg.drop_view(schema_name=test_schema_name, view_name=test_view_name)
                 pg.drop_table(schema_name=test_schema_name, table_name=test_table_name)
                 pg.drop_schema(schema_name=test_schema_name)
@@ -192,9 +307,244 @@ class TestSQLQueryTools(unittest.TestCase):
         else:
             raise Exception("Unable to establish Postgres connection, so no tests were run!")
 
+    def test_lazy_imports(self):
+        # Importing the package and building statements offline must not load heavy dependencies
+        heavy_modules = ['pandas', 'sqlalchemy', 'tqdm', 'click', 'dateutil', 'asyncio']
+        code = ('import sql_query_tools, sys; '
+                'pg = sql_query_tools.Postgres(offline=True); '
+                'pg.build_insert("s", "t", ["a", "b"], [1, "x"]); '
+                'pg.build_delete("s", "t", "a", [1, 2]); '
+                f'print([m for m in {heavy_modules!r} if m in sys.modules])')
+        result = subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE, universal_newlines=True, check=True)
+        self.assertEqual(result.stdout.strip(), '[]')
+
+    def test_render_literals_datetime(self):
+        # The vectorized and per-value renderers must agree on timestamps and NaT
+        pg = Postgres(offline=True)
+        values = pd.Series(pd.to_datetime(['2020-01-01', None, '2020-01-02']))
+        result = pg.render_literals(values).tolist()
+        self.assertEqual(result, [str(pg._render_value(x)) for x in values])
+        self.assertEqual(result, ["'2020-01-01 00:00:00'", 'null', "'2020-01-02 00:00:00'"])
+
+    def test_render_literals_na(self):
+        # pd.NA of nullable dtypes is null in both renderers
+        pg = Postgres(offline=True)
+        self.assertTrue(pg._is_null(pd.NA))
+        values = pd.Series(['a', None], dtype='string')
+        result = pg.render_literals(values).tolist()
+        self.assertEqual(result, [str(pg._render_value(x)) for x in values])
+        self.assertEqual(result, ["'a'", 'null'])
+        self.assertEqual(pg.render_literals(pd.Series([1, None], dtype='Int64')).tolist(), ['1', 'null'])
+
+    def test_build_upsert_columns(self):
+        # Dataframe columns are selected by name, not relabelled by position
+        pg = Postgres(offline=True)
+        df = pd.DataFrame({'a': ['x'], 'b': [1]})
+        result = pg.build_upsert('s', 't', ['a'], columns=['b', 'a'], rows=df)
+        self.assertEqual(result, ['insert into s.t ("b", "a") values (1, \'x\') '
+                                  'on conflict ("a") do update set "b" = excluded."b"'])
+
+    def test_BufferedLogWriter(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fpath = os.path.join(tmpdir, 'log.txt')
+
+            def read():
+                with open(fpath) as f:
+                    return f.read()
+
+            writer = BufferedLogWriter(fpath, flush_interval=60, max_buffered=3)
+            writer.write('a\n')
+            writer.write('b\n')
+            self.assertEqual(read(), '')
+
+            # Reaching `max_buffered` lines wakes the background thread
+            writer.write('c\n')
+            deadline = time.monotonic() + 5
+            while read() != 'a\nb\nc\n' and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            self.assertEqual(read(), 'a\nb\nc\n')
+
+            # Remaining lines are flushed on close
+            writer.write('d\n')
+            self.assertEqual(read(), 'a\nb\nc\n')
+            writer.close()
+            self.assertEqual(read(), 'a\nb\nc\nd\n')
+
+        pg = Postgres(offline=True)
+        self.assertRegex(pg._log_entry('select 1', 0.5, 1), r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} select 1\n$')
+        self.assertRegex(pg._log_entry('select 1', 0.5, 1, log_stats=True),
+                         r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} \[0\.500000s, 1 rows\] select 1\n$')
+
+    def test_execute_logfile(self):
+        pg = Postgres()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fpath = os.path.join(tmpdir, 'log.txt')
+            pg.execute(['select 1', 'select 2'], logfile=fpath, log_stats=True)
+            with open(fpath) as f:
+                lines = f.read().splitlines()
+
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(all(re.match(r'^\S+ \S+ \[\d+\.\d{6}s, -?\d+ rows\] select \d$', x) for x in lines))
+
+    def test_dump_cmd(self):
+        pg = Postgres(db_name='db', pg_user='user', offline=True)
+        cmd, fpath = pg._dump_cmd('pg_dump', '/backup', format='directory', jobs=4, compress=5,
+                                  schemas=['a', 'b'], exclude_tables='a.tmp_*')
+        self.assertEqual(fpath, '/backup/db')
+        self.assertEqual(cmd, ['pg_dump', '--username', 'user', '--format', 'directory', '--file', '/backup/db',
+                               '--verbose', '--jobs', '4', '--compress', '5', '--schema', 'a', '--schema', 'b',
+                               '--exclude-table', 'a.tmp_*', 'db'])
+
+        # Compressed plain-format dumps are gzipped scripts
+        self.assertEqual(pg._dump_cmd('pg_dump', '/backup')[1], '/backup/db.sql')
+        self.assertEqual(pg._dump_cmd('pg_dump', '/backup', compress=0)[1], '/backup/db.sql')
+        self.assertEqual(pg._dump_cmd('pg_dump', '/backup', compress=9)[1], '/backup/db.sql.gz')
+        self.assertEqual(pg._dump_cmd('pg_dump', '/backup', format='custom', compress=9)[1], '/backup/db.dump')
+
+        with self.assertRaises(AssertionError):
+            pg._dump_cmd('pg_dump', '/backup', format='plain', jobs=2)
+
+    def test_run_cmd(self):
+        # Output larger than the pipe buffer must not deadlock
+        code = 'import sys; sys.stdout.write("x" * 1000000)'
+        self.assertEqual(len(syscmd(f"{sys.executable} -c '{code}'", encoding='utf-8')), 1000000)
+
+        lines = []
+        returncode, tail = run_cmd([sys.executable, '-c', 'for i in range(100000): print(i)'],
+                                   callback=lines.append,
+                                   tail_lines=2)
+        self.assertEqual(returncode, 0)
+        self.assertEqual(len(lines), 100000)
+        self.assertEqual(tail, ['99998', '99999'])
+
+        with self.assertRaises(subprocess.TimeoutExpired):
+            run_cmd([sys.executable, '-c', 'import time; time.sleep(10)'], timeout=0.1)
+
+    @unittest.skipUnless(importlib.util.find_spec('asyncpg'), 'requires asyncpg')
+    def test_AsyncPostgres(self):
+        # Coroutine reads, and cached metadata for the synchronous helpers
+        async def read_async():
+            async with AsyncPostgres(max_concurrency=2) as apg:
+                await apg.prefetch_metadata('information_schema', 'tables')
+                self.assertTrue(apg.validate_dtype('information_schema', 'tables', 'table_catalog', 'string value'))
+                return await asyncio.gather(*[apg.read_sql('select 1 as x') for _ in range(4)])
+
+        loop = asyncio.new_event_loop()
+        try:
+            result = loop.run_until_complete(read_async())
+        finally:
+            loop.close()
 
-case = TestSQLQueryTools()
+        self.assertEqual([x.tolist() for x in result], [[1]] * 4)
 
-test_methods = [x for x in dir(case) if x.startswith('test_')]
-for method in test_methods:
-    getattr(case, method)()
\ No newline at end of file
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), 'requires pyarrow')
+    def test_export_import_table(self):
+        pg = Postgres()
+        test_schema_name = f'test_export_schema_{getpid()}'
+        pg.create_schema(schema_name=test_schema_name)
+        try:
+            columnspec = {'id': 'int', 'amount': 'numeric(12,4)', 'label': 'text', 'tags': 'int[]'}
+            pg.create_table(schema_name=test_schema_name, table_name='source', columnspec=columnspec)
+            pg.create_table(schema_name=test_schema_name, table_name='target', columnspec=columnspec)
+            pg.execute(f"insert into {test_schema_name}.source values "
+                       f"(1, 12345678.1234, '', '{{1,2}}'), (2, 0.0001, 'null', '{{}}'), (3, null, null, null)")
+
+            # Decimals, strings that look like nulls and arrays must round-trip exactly through both formats
+            with tempfile.TemporaryDirectory() as tmpdir:
+                for format in ['parquet', 'arrow']:
+                    fpath = pg.export_table(schema_name=test_schema_name,
+                                            table_name='source',
+                                            fpath=os.path.join(tmpdir, f'source.{format}'),
+                                            format=format,
+                                            batchsize=2)
+                    pg.wipe_table(schema_name=test_schema_name, table_name='target', truncate=True)
+                    result = pg.import_table(fpath=fpath, schema_name=test_schema_name, table_name='target')
+                    self.assertEqual(result, 3)
+                    result = pg.read_sql(f'select amount::text, label, tags::text from {test_schema_name}.target order by id')
+                    self.assertEqual(result['amount'].tolist(), ['12345678.1234', '0.0001', None])
+                    self.assertEqual(result['label'].tolist(), ['', 'null', None])
+                    self.assertEqual(result['tags'].tolist(), ['{1,2}', '{}', None])
+
+            # Output column names need not be unique, and a trailing semicolon is ignored
+            result = pg.read_arrow(f'select id, amount as id from {test_schema_name}.source order by 1;')
+            self.assertEqual(result.column_names, ['id', 'id'])
+            self.assertEqual(result.column(0).to_pylist(), [1, 2, 3])
+
+            # An empty result is an empty table of the query's columns, and a trailing comment
+            # must not swallow the subquery's closing parenthesis
+            result = pg.read_arrow(f'select id, amount from {test_schema_name}.source where false -- no rows')
+            self.assertEqual(result.num_rows, 0)
+            self.assertEqual(result.column_names, ['id', 'amount'])
+            self.assertEqual(str(result.schema.field('id').type), 'int32')
+            result = pg.read_sql(f'select id from {test_schema_name}.source where false', engine='arrow')
+            self.assertEqual(len(result), 0)
+
+        finally:
+            pg.drop_schema(schema_name=test_schema_name, cascade=True)
+
+    def test_execute_parallel(self):
+        test_schema_name = f'test_parallel_schema_{getpid()}'
+        pg = Postgres()
+        pg.create_schema(schema_name=test_schema_name)
+        try:
+            pg.create_table(schema_name=test_schema_name, table_name='t', columnspec={'id': 'int'})
+            insert = f'insert into {test_schema_name}.t values ' + '({})'
+
+            # Each statement commits on its own, and errors are reported in input order
+            sql = [insert.format(1), 'select * from nonexistent_table', insert.format(2), insert.format(3)]
+            report = pg.execute(sql, parallel=True, max_workers=2, transaction='statement')
+            self.assertEqual([x['index'] for x in report], [0, 1, 2, 3])
+            self.assertEqual([x['rowcount'] for x in report], [1, None, 1, 1])
+            self.assertEqual([x['error'] is None for x in report], [True, False, True, True])
+            self.assertEqual(sorted(pg.read_sql(f'select id from {test_schema_name}.t').tolist()), [1, 2, 3])
+
+            # A single failure rolls back the statements of every worker
+            sql = [insert.format(4), insert.format(5), 'select * from nonexistent_table', insert.format(6)]
+            with self.assertRaises(Exception):
+                pg.execute(sql, parallel=True, max_workers=2, transaction='all')
+
+            self.assertEqual(sorted(pg.read_sql(f'select id from {test_schema_name}.t').tolist()), [1, 2, 3])
+
+        finally:
+            pg.drop_schema(schema_name=test_schema_name, cascade=True)
+
+    def test_dump_tables_client(self):
+        test_schema_name = f'test_dump_schema_{getpid()}'
+        pg = Postgres()
+        pg.create_schema(schema_name=test_schema_name)
+        try:
+            pg.create_table(schema_name=test_schema_name, table_name='plain', columnspec={'id': 'int', 'label': 'text'})
+            pg.execute(f"insert into {test_schema_name}.plain values (1, 'a'), (2, 'b,c')")
+            pg.execute(f'create table {test_schema_name}.parent (id int) partition by range (id)')
+            pg.execute(f'create table {test_schema_name}.child partition of {test_schema_name}.parent '
+                       f'for values from (0) to (10)')
+            pg.execute(f'insert into {test_schema_name}.parent values (1)')
+
+            # Parallel workers, and a pool too small to spare a connection besides the snapshot
+            for kwargs in [dict(), dict(pool_size=1, max_overflow=0, share_engine=False)]:
+                pg_dump = Postgres(**kwargs)
+                with tempfile.TemporaryDirectory() as tmpdir:
+                    result = pg_dump.dump_tables(tmpdir, method='client', coerce_csv=True, max_workers=2)
+                    result = [os.path.basename(x) for x in result]
+                    self.assertIn(f'{test_schema_name}.plain.csv', result)
+                    self.assertIn(f'{test_schema_name}.child.csv', result)
+                    self.assertNotIn(f'{test_schema_name}.parent.csv', result)
+
+                    # Text values are quoted, numeric values are not
+                    with open(os.path.join(tmpdir, f'{test_schema_name}.plain.csv')) as f:
+                        self.assertEqual(f.read().splitlines(), ['id,label', '1,"a"', '2,"b,c"'])
+
+        finally:
+            pg.drop_schema(schema_name=test_schema_name, cascade=True)
+
+
+if __name__ == '__main__':
+    case = TestSQLQueryTools()
+
+    test_methods = [x for x in dir(case) if x.startswith('test_')]
+    for method in test_methods:
+        try:
+            getattr(case, method)()
+        except unittest.SkipTest as e:
+            print(f'Skipped {method}: {e}')
\ No newline at end of file